@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Audio buffer storage: float32 vs int16 (--buffer-dtype).
+
+Compares, per buffer length, the memory held by one session's rolling buffer and the per-iteration cost
+of producing the float32 view handed to transcribe(). The float32 view of an int16 buffer is a scratch
+copy that lives only for the duration of the call.
+
+Usage:
+  python benchmarks/bench_buffer_dtype.py [--seconds 15 60 300] [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from whisper_online import SAMPLING_RATE, OnlineASRProcessor  # noqa: E402
+
+
+class _NoASR:
+    transcription_separator = ""
+
+
+def bench(seconds, dtype, repeat, chunk_sec=1.0):
+    proc = OnlineASRProcessor(_NoASR(), buffer_dtype=dtype)
+    rng = np.random.default_rng(0)
+    wire = rng.integers(-8000, 8000, int(chunk_sec * SAMPLING_RATE), dtype=np.int16)
+    chunk = wire if dtype == "int16" else wire.astype(np.float32) / 32768.0
+    for _ in range(int(seconds / chunk_sec)):
+        proc.insert_audio_chunk(chunk)
+    t = time.perf_counter()
+    for _ in range(repeat):
+        proc.audio_view()
+    view_ms = (time.perf_counter() - t) / repeat * 1000
+    return proc.audio_buffer.nbytes, view_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[15, 60, 300])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'buffer':>8} | {'float32 MB':>10} | {'int16 MB':>8} | {'saved MB':>8} | {'view ms (int16)':>15}")
+    for seconds in args.seconds:
+        f_bytes, _ = bench(seconds, "float32", args.repeat)
+        i_bytes, view_ms = bench(seconds, "int16", args.repeat)
+        print(
+            f"{seconds:>7.0f}s | {f_bytes / 2**20:>10.2f} | {i_bytes / 2**20:>8.2f} | "
+            f"{(f_bytes - i_bytes) / 2**20:>8.2f} | {view_ms:>15.3f}"
+        )
+    print("float32 view cost is 0 (the buffer itself is passed); compare 'view ms' with the model's transcribe time.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Cross-process audio transport: multiprocessing.Queue (pickled numpy chunks) vs shm_audio.AudioRing.
+
+A producer process streams PCM16 packets as fast as possible to a consumer process, which appends
+them to an OnlineASRProcessor-style buffer. Reports throughput in seconds of audio per wall second
+and mean end-to-end delay of a packet (send to available in the consumer's buffer).
+
+Usage:
+  python benchmarks/bench_shm_audio.py [--seconds 600] [--packet-ms 100]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shm_audio import STREAM_ENDED, AudioRing  # noqa: E402
+
+SAMPLING_RATE = 16000
+
+
+def _packets(seconds, packet_ms):
+    rng = np.random.default_rng(0)
+    packet = rng.integers(-8000, 8000, SAMPLING_RATE * packet_ms // 1000, dtype=np.int16)
+    return packet, int(seconds * 1000 / packet_ms)
+
+
+def queue_producer(q, seconds, packet_ms):
+    packet, count = _packets(seconds, packet_ms)
+    for _ in range(count):
+        # the server decodes to float32 before handing audio on
+        q.put((time.perf_counter(), packet.astype(np.float32) / 32768.0))
+    q.put(None)
+
+
+def queue_consumer(q, result):
+    buffer = np.zeros(0, dtype=np.float32)
+    delays = []
+    while (item := q.get()) is not None:
+        sent, audio = item
+        buffer = np.append(buffer[-SAMPLING_RATE * 30 :], audio)
+        delays.append(time.perf_counter() - sent)
+    result.put(sum(delays) / len(delays))
+
+
+def ring_producer(spec, sent_times, seconds, packet_ms):
+    ring = AudioRing.attach(**spec)
+    packet, count = _packets(seconds, packet_ms)
+    for i in range(count):
+        sent_times[i] = time.perf_counter()
+        off = 0
+        while off < len(packet):
+            off += ring.write(packet[off:])
+    ring.close_writer()
+    ring.release()
+
+
+def ring_consumer(spec, sent_times, packet_samples, result):
+    ring = AudioRing.attach(**spec)
+    buffer = np.zeros(0, dtype=np.int16)
+    delays = []
+    while ring.wait(packet_samples) is not STREAM_ENDED:
+        with ring.reading() as audio:
+            buffer = np.append(buffer[-SAMPLING_RATE * 30 :], audio)
+        now = time.perf_counter()
+        done = (ring.read_pos // packet_samples) - 1
+        if done >= 0:
+            delays.append(now - sent_times[done])
+    ring.release()
+    result.put(sum(delays) / len(delays))
+
+
+def run_queue(seconds, packet_ms):
+    q, result = mp.Queue(), mp.Queue()
+    t = time.perf_counter()
+    procs = [
+        mp.Process(target=queue_producer, args=(q, seconds, packet_ms)),
+        mp.Process(target=queue_consumer, args=(q, result)),
+    ]
+    for p in procs:
+        p.start()
+    delay = result.get()
+    for p in procs:
+        p.join()
+    return time.perf_counter() - t, delay
+
+
+def run_ring(seconds, packet_ms):
+    ring = AudioRing.create(capacity_sec=30, dtype="int16")
+    packet, count = _packets(seconds, packet_ms)
+    sent_times = mp.Array("d", count, lock=False)
+    result = mp.Queue()
+    t = time.perf_counter()
+    procs = [
+        mp.Process(target=ring_producer, args=(ring.spec(), sent_times, seconds, packet_ms)),
+        mp.Process(target=ring_consumer, args=(ring.spec(), sent_times, len(packet), result)),
+    ]
+    for p in procs:
+        p.start()
+    delay = result.get()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - t
+    ring.release()
+    return elapsed, delay
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=600)
+    parser.add_argument("--packet-ms", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'transport':>10} | {'audio s / wall s':>16} | {'mean delay ms':>13}")
+    for name, run in (("queue", run_queue), ("shm ring", run_ring)):
+        elapsed, delay = run(args.seconds, args.packet_ms)
+        print(f"{name:>10} | {args.seconds / elapsed:>16.0f} | {delay * 1000:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,18 +16,34 @@ language="${LANGUAGE:-auto}"
 log_level="${LOG_LEVEL:-INFO}"
 min_chunk_size="${MIN_CHUNK_SIZE:-1}"
 sampling_rate="${SAMPLING_RATE:-16000}"
+buffer_dtype="${BUFFER_DTYPE:-float32}"
+decode_profile="${DECODE_PROFILE:-accurate}"
 
 disable_flag=""
 if [ "${DISABLE_GPU:-}" != "" ]; then
   disable_flag="--disable_gpu"
 fi
 
+compact_flag=""
+if [ "${COMPACT_SILENCE:-}" != "" ]; then
+  compact_flag="--compact-silence"
+fi
+
+draft_flag=""
+if [ "${DRAFT_MODEL:-}" != "" ]; then
+  draft_flag="--draft-model ${DRAFT_MODEL}"
+fi
+
 exec python whisper_online_server.py \
 	--backend $backend \
 	--model $model \
 	--min-chunk-size $min_chunk_size \
 	--sampling_rate $sampling_rate \
+	--buffer-dtype $buffer_dtype \
+	--decode-profile $decode_profile \
+	$draft_flag \
 	$disable_flag \
+	$compact_flag \
 	--port 3000 \
 	--host 0.0.0.0 \
 	--log-level $log_level \
@@ -13,12 +13,35 @@ containing:
 
   - Zero or more \0 bytes as required to pad the packet to PACKET_SIZE
 
-Originally from the UEDIN team of the ELITR project. 
+Originally from the UEDIN team of the ELITR project.
 """
 
 PACKET_SIZE = 65536
 
 
+def encode_line(text, pad_zeros=False):
+    """Encodes the first line of 'text' into the bytes send_one_line() transmits.
+
+    Padding (if requested) is applied once for the whole line, so the result can
+    be concatenated with other encoded lines and written in a single call.
+
+    Args:
+        text: string containing a line of text for transmission.
+        pad_zeros: pad with \0 bytes up to a multiple of PACKET_SIZE.
+    """
+    lines = text.replace("\0", "\n").splitlines()
+    first_line = "" if len(lines) == 0 else lines[0]
+    # TODO Is there a better way of handling bad input than 'replace'?
+    data = bytearray(first_line.encode("utf-8", errors="replace"))
+    data += b"\n"
+    if pad_zeros:
+        data += b"\0"
+        remainder = len(data) % PACKET_SIZE
+        if remainder:
+            data += bytes(PACKET_SIZE - remainder)
+    return bytes(data)
+
+
 def send_one_line(socket, text, pad_zeros=False):
     """Sends a line of text over the given socket.
 
@@ -35,18 +58,4 @@ def send_one_line(socket, text, pad_zeros=False):
         socket: a socket object.
         text: string containing a line of text for transmission.
     """
-    text.replace('\0', '\n')
-    lines = text.splitlines()
-    first_line = '' if len(lines) == 0 else lines[0]
-    # TODO Is there a better way of handling bad input than 'replace'?
-    data = first_line.encode('utf-8', errors='replace') + b'\n' + (b'\0' if pad_zeros else b'')
-    for offset in range(0, len(data), PACKET_SIZE):
-        bytes_remaining = len(data) - offset
-        if bytes_remaining < PACKET_SIZE:
-            padding_length = PACKET_SIZE - bytes_remaining
-            packet = data[offset:] + (b'\0' * padding_length if pad_zeros else b'')
-        else:
-            packet = data[offset:offset+PACKET_SIZE]
-        socket.sendall(packet)
-
-
+    socket.sendall(encode_line(text, pad_zeros))
@@ -0,0 +1,212 @@
+"""Shared-memory audio transport for splitting socket handling and inference into separate processes.
+
+One AudioRing per session: a single-producer / single-consumer ring buffer in a
+multiprocessing.shared_memory segment. The ingest process writes PCM into it (straight from the
+socket with recv_into() for int16 rings), the inference process reads numpy views of the same
+memory. Audio never goes through pickling or a pipe; only the ring spec (name, capacity, dtype)
+is sent once as a small control message.
+
+    # ingest process
+    ring = AudioRing.create(capacity_sec=30, dtype="int16")
+    control.put(("open", session, ring.spec()))
+    while ring.recv_into(sock) is not STREAM_ENDED: ...
+    ring.close_writer()
+
+    # inference process
+    ring = AudioRing.attach(**spec)
+    while ring.wait(min_samples) is not STREAM_ENDED:
+        with ring.reading() as audio:   # view of the shared memory, consumed when the block exits
+            online.insert_audio_chunk(audio)
+    ring.release()
+
+Lock-free indices: write_pos and read_pos are monotonically increasing sample counts in separate
+cache lines of the header; each is stored only by its own side (producer publishes write_pos after
+the samples are in place, consumer publishes read_pos after it is done with them). This relies on
+aligned 8-byte stores being atomic and becoming visible to the other process in program order. Python
+cannot issue memory barriers, so that only holds on x86 (total store order); on other CPUs (e.g. the
+arm64 image in docker-compose.yaml) create() and attach() raise RuntimeError.
+"""
+
+import contextlib
+import os
+import platform
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+SAMPLING_RATE = 16000
+POLL_SEC = 0.005  # consumer poll interval in wait() (no cross-process condition variable)
+
+_HEADER_BYTES = 192
+_WRITE_POS = 0  # int64 slot index in the header (byte offset 0)
+_CLOSED = 1  # set by the producer at end of stream
+_READ_POS = 8  # byte offset 64: own cache line
+
+NO_DATA_YET = object()
+STREAM_ENDED = object()
+
+_ORDERED_STORES = platform.machine().lower() in ("x86_64", "amd64", "i386", "i686", "x86")
+_HAS_TRACK_ARG = sys.version_info >= (3, 13)  # SharedMemory(track=False)
+
+
+def _check_platform():
+    if not _ORDERED_STORES:
+        raise RuntimeError(
+            f"AudioRing relies on x86 store ordering (no memory barriers from Python); "
+            f"not supported on {platform.machine()}"
+        )
+
+
+class AudioRing:
+    def __init__(self, shm, capacity, dtype, owner):
+        self.shm = shm
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self.owner = owner  # creator unlinks the segment
+        self._header = np.ndarray((_HEADER_BYTES // 8,), dtype=np.int64, buffer=shm.buf)
+        self._data = np.ndarray((capacity,), dtype=self.dtype, buffer=shm.buf, offset=_HEADER_BYTES)
+        self._bytes = self._data.view(np.uint8)
+        self._odd_byte = 0  # producer: first byte of a sample already received by recv_into()
+
+    @classmethod
+    def create(cls, capacity_sec=30.0, dtype="int16", name=None):
+        _check_platform()
+        capacity = int(capacity_sec * SAMPLING_RATE)
+        size = _HEADER_BYTES + capacity * np.dtype(dtype).itemsize
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(shm, capacity, dtype, owner=True)
+        ring._header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, capacity, dtype):
+        _check_platform()
+        if _HAS_TRACK_ARG:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # the creator owns the segment
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # registered with this process's resource tracker, which would unlink the creator's segment when
+            # this process exits
+            if os.name == "posix":
+                resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, capacity, dtype, owner=False)
+
+    def spec(self):
+        """The control message another process needs to attach()."""
+        return {"name": self.shm.name, "capacity": self.capacity, "dtype": self.dtype.str}
+
+    @property
+    def write_pos(self):
+        return int(self._header[_WRITE_POS])
+
+    @property
+    def read_pos(self):
+        return int(self._header[_READ_POS])
+
+    @property
+    def closed(self):
+        return bool(self._header[_CLOSED])
+
+    def available(self):
+        return self.write_pos - self.read_pos
+
+    # producer side
+
+    def free(self):
+        return self.capacity - self.available()
+
+    def write(self, samples):
+        """Copies as many samples as fit (converted to the ring dtype). Returns the number written."""
+        w = self.write_pos
+        n = min(len(samples), self.capacity - (w - self.read_pos))
+        if n <= 0:
+            return 0
+        start = w % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start : start + first] = samples[:first]
+        self._data[: n - first] = samples[first:n]
+        self._header[_WRITE_POS] = w + n
+        return n
+
+    def recv_into(self, sock, max_bytes=65536):
+        """Receives PCM16LE from sock directly into the ring (int16 rings only, no decode step).
+        Returns the number of whole samples published, NO_DATA_YET if the ring is full, or
+        STREAM_ENDED when the peer closed. socket.timeout propagates to the caller."""
+        if self.dtype != np.dtype("<i2"):
+            raise TypeError("recv_into() needs an int16 ring; use write() with decoded samples")
+        w = self.write_pos
+        free = self.capacity - (w - self.read_pos)
+        if free <= 0:
+            return NO_DATA_YET
+        start = w % self.capacity
+        contiguous = min(free, self.capacity - start)
+        lo = start * 2 + self._odd_byte
+        hi = min((start + contiguous) * 2, lo + max_bytes)
+        got = sock.recv_into(self._bytes[lo:hi])
+        if got == 0:
+            return STREAM_ENDED
+        total = self._odd_byte + got
+        n, self._odd_byte = divmod(total, 2)
+        if n:
+            self._header[_WRITE_POS] = w + n
+        return n
+
+    def close_writer(self):
+        """Marks end of stream; the consumer drains what is left and then sees STREAM_ENDED."""
+        self._header[_CLOSED] = 1
+
+    # consumer side
+
+    def wait(self, min_samples, timeout=0.1):
+        """Like AudioReceiver.wait(): True when reading() has at least min_samples (or a final partial
+        chunk), NO_DATA_YET on timeout, STREAM_ENDED when the producer closed and the ring is empty."""
+        deadline = time.monotonic() + timeout
+        while True:
+            closed = self.closed  # read before available() so no samples published before close are missed
+            n = self.available()
+            if n >= min_samples or (closed and n > 0):
+                return True
+            if closed:
+                return STREAM_ENDED
+            if time.monotonic() >= deadline:
+                return NO_DATA_YET
+            time.sleep(POLL_SEC)
+
+    def views(self, max_samples=None):
+        """Zero-copy views of the readable samples: (first, second), second is empty unless the region
+        wraps. Valid until consume(); the producer does not overwrite them before that."""
+        r = self.read_pos
+        n = self.write_pos - r
+        if max_samples is not None:
+            n = min(n, max_samples)
+        start = r % self.capacity
+        first = min(n, self.capacity - start)
+        return self._data[start : start + first], self._data[: n - first]
+
+    def consume(self, n):
+        self._header[_READ_POS] = self.read_pos + n
+
+    @contextlib.contextmanager
+    def reading(self, max_samples=None):
+        """Yields the readable samples as one array and consumes them on exit. It is a view of the shared
+        memory unless the region wraps (then one concatenated copy); copy it out (e.g. with
+        OnlineASRProcessor.insert_audio_chunk) inside the block."""
+        first, second = self.views(max_samples)
+        yield first if not len(second) else np.concatenate((first, second))
+        self.consume(len(first) + len(second))
+
+    def release(self):
+        """Detaches this process; the creator also unlinks the segment."""
+        self._header = self._data = self._bytes = None
+        self.shm.close()
+        if self.owner:
+            if not _HAS_TRACK_ARG and os.name == "posix":
+                # an attacher sharing our tracker (multiprocessing child) may have unregistered the name;
+                # register again so unlink()'s own unregister stays balanced (registration is a set add)
+                resource_tracker.register(self.shm._name, "shared_memory")
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,124 @@
+"""Low-overhead per-stage timing spans for the live pipeline.
+
+Usage (hot path):
+
+    stage_trace.sample("studio-a")        # once per iteration/packet: decide whether to record it
+    with stage_trace.span("transcribe"):
+        ...
+
+Sampling is decided per thread at sample(); while a thread is not sampled span() returns a shared
+no-op context manager, so the disabled cost is one attribute lookup. Recorded spans go into a bounded
+ring (exported as Chrome trace-event JSON, loadable in chrome://tracing or Perfetto) and into a rolling
+per-session, per-stage summary.
+
+The sample rate starts at TRACE_SAMPLE_RATE (0 = off) and can be changed at runtime with set_sample_rate().
+"""
+
+import collections
+import contextlib
+import os
+import random
+import threading
+import time
+
+TRACE_MAX_EVENTS = 20000  # ring size for the Chrome trace export
+SUMMARY_WINDOW = 200  # most recent spans per (session, stage) kept for the rolling summary
+
+_sample_rate = float(os.environ.get("TRACE_SAMPLE_RATE", "0"))
+_local = threading.local()
+_lock = threading.Lock()
+_events = collections.deque(maxlen=TRACE_MAX_EVENTS)
+_recent = {}  # (session, stage) -> deque of durations (seconds)
+_NULL = contextlib.nullcontext()
+
+
+def set_sample_rate(rate):
+    """0 disables tracing, 1 records every iteration."""
+    global _sample_rate
+    _sample_rate = min(1.0, max(0.0, float(rate)))
+
+
+def sample_rate():
+    return _sample_rate
+
+
+def sample(session=None):
+    """Start a sampling unit on this thread (e.g. one process_iter or one received packet)."""
+    _local.sampled = _sample_rate > 0 and (_sample_rate >= 1 or random.random() < _sample_rate)
+    if session is not None:
+        _local.session = session
+
+
+def span(name):
+    if not getattr(_local, "sampled", False):
+        return _NULL
+    return _Span(name, getattr(_local, "session", ""))
+
+
+class _Span:
+    __slots__ = ("name", "session", "start")
+
+    def __init__(self, name, session):
+        self.name = name
+        self.session = session
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        dur = end - self.start
+        with _lock:
+            _events.append((self.name, self.session, self.start, dur, threading.get_ident()))
+            key = (self.session, self.name)
+            recent = _recent.get(key)
+            if recent is None:
+                recent = _recent[key] = collections.deque(maxlen=SUMMARY_WINDOW)
+            recent.append(dur)
+        return False
+
+
+def chrome_trace():
+    """Recorded spans as a Chrome trace-event JSON object ("X" complete events, microseconds)."""
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+    return {
+        "displayTimeUnit": "ms",
+        "traceEvents": [
+            {
+                "name": name,
+                "cat": "stage",
+                "ph": "X",
+                "ts": round(start * 1e6, 1),
+                "dur": round(dur * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": {"session": session},
+            }
+            for name, session, start, dur, tid in events
+        ],
+    }
+
+
+def summary():
+    """{session: {stage: {count, mean_ms, p95_ms, max_ms}}} over the most recent spans."""
+    with _lock:
+        items = [(k, sorted(v)) for k, v in _recent.items()]
+    out = {}
+    for (session, stage), durs in items:
+        n = len(durs)
+        out.setdefault(session, {})[stage] = {
+            "count": n,
+            "mean_ms": round(sum(durs) / n * 1000, 3),
+            "p95_ms": round(durs[min(n - 1, int(n * 0.95))] * 1000, 3),
+            "max_ms": round(durs[-1] * 1000, 3),
+        }
+    return out
+
+
+def reset():
+    with _lock:
+        _events.clear()
+        _recent.clear()
@@ -0,0 +1,23 @@
+"""insert_audio_chunk() accepts int16 PCM and floats of any dtype; only int16 input is rescaled."""
+
+import numpy as np
+import pytest
+
+from whisper_online import OnlineASRProcessor
+
+
+@pytest.mark.parametrize("buffer_dtype", ["float32", "int16"])
+@pytest.mark.parametrize(
+    "audio",
+    [
+        np.array([0.5, -0.25, 0.0], dtype=np.float32),
+        np.array([0.5, -0.25, 0.0], dtype=np.float64),
+        np.array([16384, -8192, 0], dtype=np.int16),
+    ],
+    ids=["float32", "float64", "int16"],
+)
+def test_every_input_dtype_keeps_its_level(buffer_dtype, audio):
+    proc = OnlineASRProcessor(None, buffer_dtype=buffer_dtype)
+    proc.insert_audio_chunk(audio)
+    assert proc.audio_buffer.dtype == np.dtype(buffer_dtype)
+    assert proc.audio_view() == pytest.approx([0.5, -0.25, 0.0])
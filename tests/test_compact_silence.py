@@ -0,0 +1,120 @@
+"""--compact-silence must not change committed timestamps: the model sees compacted audio, but everything
+inserted into the hypothesis buffer and every segment end used for trimming is in uncompacted buffer time."""
+
+import numpy as np
+import pytest
+
+from whisper_online import COMPACT_KEEP_SEC, SAMPLING_RATE, FasterWhisperASR, OnlineASRProcessor
+
+FRAME = 480  # silence_spans frame (30 ms); tone/silence lengths are whole frames so detection is exact
+PAD = int(COMPACT_KEEP_SEC * SAMPLING_RATE)
+
+
+class _Segment:
+    def __init__(self, word):
+        self.words = [word]
+        self.start, self.end = word.start, word.end
+        self.no_speech_prob = 0.0
+
+
+class _Word:
+    def __init__(self, start, end, word):
+        self.start, self.end, self.word = start, end, word
+
+
+class ToneASR(FasterWhisperASR):
+    """Recognizes every tone as one word (named after its length) in one segment. Word edges are padded by
+    COMPACT_KEEP_SEC into the surrounding silence, which puts them exactly on the cut points of compacted audio."""
+
+    def __init__(self):
+        self.transcribe_kargs = {}
+        self.original_language = "en"
+
+    def transcribe(self, audio, init_prompt="", **decode_options):
+        loud = np.concatenate(([0], (np.abs(audio) > 1e-3).view(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(loud))
+        segments = []
+        for b, e in zip(edges[::2], edges[1::2]):
+            start, end = max(0, b - PAD), min(len(audio), e + PAD)
+            segments.append(_Segment(_Word(start / SAMPLING_RATE, end / SAMPLING_RATE, f" t{(e - b) // FRAME}")))
+        return segments
+
+
+def tone(frames):
+    n = np.arange(frames * FRAME)
+    return np.where((n // 20) % 2, 0.3, -0.3).astype(np.float32)
+
+
+def silence(frames):
+    return np.zeros(frames * FRAME, dtype=np.float32)
+
+
+def make_audio():
+    """Tones of distinct lengths separated by short (kept) and long (compacted) silences, about 45 s."""
+    parts = []
+    for i in range(12):
+        parts.append(tone(20 + 3 * i))
+        parts.append(silence(80 if i % 3 else 20))  # 2.4 s (cut) or 0.6 s (kept)
+    return np.concatenate(parts)
+
+
+def run(audio, compact, monkeypatch):
+    proc = OnlineASRProcessor(ToneASR(), compact_silence=compact)
+    inserted, chunked, cuts = [], [], []
+    insert, chunk_at, compact_audio = proc.transcript_buffer.insert, proc.chunk_at, proc.compact_audio
+
+    def record_insert(new, offset):
+        inserted.append(([(a, b, w) for a, b, w in new], offset))
+        insert(new, offset)
+
+    def record_chunk_at(t):
+        chunked.append(t)
+        chunk_at(t)
+
+    def record_compact(a):
+        out, index = compact_audio(a)
+        if index is not None:
+            cuts.extend(index[0])
+        return out, index
+
+    monkeypatch.setattr(proc.transcript_buffer, "insert", record_insert)
+    monkeypatch.setattr(proc, "chunk_at", record_chunk_at)
+    monkeypatch.setattr(proc, "compact_audio", record_compact)
+    for i in range(0, len(audio), SAMPLING_RATE):
+        proc.insert_audio_chunk(audio[i : i + SAMPLING_RATE])
+        proc.process_iter()
+    return inserted, chunked, proc.commited, cuts
+
+
+def test_compaction_keeps_buffer_time(monkeypatch):
+    audio = make_audio()
+    plain = run(audio, False, monkeypatch)
+    compact = run(audio, True, monkeypatch)
+
+    assert compact[3], "test audio must trigger compaction"
+    assert plain[1], "test audio must trigger segment trimming"
+    for (words_p, offset_p), (words_c, offset_c) in zip(plain[0], compact[0], strict=True):
+        assert offset_c == offset_p
+        assert [w for *_, w in words_c] == [w for *_, w in words_p]
+        for (a_p, b_p, _), (a_c, b_c, _) in zip(words_p, words_c):
+            assert a_c == pytest.approx(a_p, abs=1e-9)
+            assert b_c == pytest.approx(b_p, abs=1e-9)
+    assert compact[1] == pytest.approx(plain[1], abs=1e-9)  # chunk_completed_segment ends
+    assert [w for *_, w in compact[2]] == [w for *_, w in plain[2]]
+    assert [t for t, *_ in compact[2]] == pytest.approx([t for t, *_ in plain[2]], abs=1e-9)
+
+
+def test_cut_boundaries_map_to_the_right_side():
+    proc = OnlineASRProcessor(ToneASR(), compact_silence=True)
+    audio = np.concatenate((tone(20), silence(100), tone(20)))
+    compacted, proc.time_index = proc.compact_audio(audio)
+    (point,), (shift,) = proc.time_index
+    removed = len(audio) - len(compacted)
+    assert shift == removed / SAMPLING_RATE
+    # an end exactly at the cut is the end of the audio before it, a start there is the audio after it
+    assert proc.to_buffer_time(point, end=True) == pytest.approx(point)
+    assert proc.to_buffer_time(point) == pytest.approx(point + shift)
+    words = proc.asr.ts_words(proc.asr.transcribe(compacted))
+    mapped = [t for a, b, _ in words for t in (proc.to_buffer_time(a), proc.to_buffer_time(b, end=True))]
+    expected = [t for a, b, _ in proc.asr.ts_words(proc.asr.transcribe(audio)) for t in (a, b)]
+    assert mapped == pytest.approx(expected)
@@ -0,0 +1,29 @@
+"""Offline outputs mirror the input layout and keep the input extension, so no two inputs write the same file."""
+
+import os
+
+from whisper_offline import find_audio_files, output_base, output_collisions
+
+
+def make_tree(root, names):
+    for name in names:
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+
+
+def test_directory_layout_is_mirrored_below_output_dir(tmp_path):
+    make_tree(tmp_path / "archive", ["a/x.wav", "b/x.wav", "b/x.mp3", "notes.txt"])
+    files = list(find_audio_files([str(tmp_path / "archive")]))
+    out = tmp_path / "out"
+    bases = [os.path.relpath(output_base(path, name, str(out)), out) for path, name in files]
+    assert bases == [os.path.join("a", "x.wav"), os.path.join("b", "x.mp3"), os.path.join("b", "x.wav")]
+    assert output_collisions(files, str(out)) == []
+    assert output_collisions(files, None) == []
+
+
+def test_same_file_name_from_two_arguments_is_a_collision(tmp_path):
+    make_tree(tmp_path, ["a/x.wav", "b/x.wav"])
+    files = list(find_audio_files([str(tmp_path / "a" / "x.wav"), str(tmp_path / "b")]))
+    assert output_collisions(files, None) == []  # next to their inputs
+    assert output_collisions(files, str(tmp_path / "out")) == [[path for path, _ in files]]
@@ -0,0 +1,117 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import shm_audio
+from shm_audio import NO_DATA_YET, STREAM_ENDED, AudioRing
+
+pytestmark = pytest.mark.skipif(not shm_audio._ORDERED_STORES, reason="AudioRing needs x86 store ordering")
+
+CAPACITY_SEC = 0.01  # 160 samples: the tests wrap around many times
+
+
+@pytest.fixture
+def ring():
+    ring = AudioRing.create(capacity_sec=CAPACITY_SEC, dtype="int16")
+    yield ring
+    ring.release()
+
+
+def drain(ring, out):
+    while ring.wait(1, timeout=0) is True:
+        with ring.reading() as audio:
+            out.append(audio.copy())
+
+
+def test_write_wraps_around_and_stops_when_full(ring):
+    data = np.arange(5000, dtype=np.int16)
+    out, pos = [], 0
+    for size in (1, 97, 159, 160, 33, 500):
+        while pos < len(data):
+            pos += ring.write(data[pos : pos + size])
+            assert 0 <= ring.available() <= ring.capacity
+            if ring.free() == 0:
+                assert ring.write(data[pos : pos + 1]) == 0
+            drain(ring, out)
+    assert np.array_equal(np.concatenate(out), data)
+
+
+def test_views_split_at_the_end_of_the_ring(ring):
+    ring.write(np.zeros(150, dtype=np.int16))
+    ring.consume(150)
+    ring.write(np.arange(20, dtype=np.int16))
+    first, second = ring.views()
+    assert (len(first), len(second)) == (10, 10)
+    with ring.reading() as audio:
+        assert np.array_equal(audio, np.arange(20))
+    assert ring.available() == 0
+
+
+def test_recv_into_carries_odd_bytes_across_packets_and_wraps(ring):
+    data = np.arange(-3000, 3000, dtype=np.int16)
+    a, b = socket.socketpair()
+
+    def send():
+        raw = data.tobytes()
+        for i in range(0, len(raw), 33):  # odd packet sizes: samples split across recv() calls
+            b.sendall(raw[i : i + 33])
+            time.sleep(0.0005)
+        b.close()
+
+    sender = threading.Thread(target=send)
+    sender.start()
+    out = []
+    a.settimeout(5)
+    while True:
+        r = ring.recv_into(a, max_bytes=57)
+        if r is STREAM_ENDED:
+            break
+        if r is NO_DATA_YET:
+            assert ring.free() == 0
+        drain(ring, out)
+    sender.join()
+    a.close()
+    assert np.array_equal(np.concatenate(out), data)
+
+
+def test_close_writer_drains_before_stream_ended(ring):
+    ring.write(np.arange(50, dtype=np.int16))
+    assert ring.wait(100, timeout=0.01) is NO_DATA_YET
+    ring.close_writer()
+    assert ring.wait(100, timeout=0) is True  # final partial chunk
+    with ring.reading(max_samples=30) as audio:
+        assert np.array_equal(audio, np.arange(30))
+    assert ring.wait(100, timeout=0) is True
+    with ring.reading() as audio:
+        assert np.array_equal(audio, np.arange(30, 50))
+    assert ring.wait(100, timeout=0) is STREAM_ENDED
+
+
+def test_attached_ring_shares_memory(ring):
+    reader = AudioRing.attach(**ring.spec())
+    try:
+        ring.write(np.arange(10, dtype=np.int16))
+        assert reader.available() == 10
+        with reader.reading() as audio:
+            assert np.array_equal(audio, np.arange(10))
+        assert ring.free() == ring.capacity
+    finally:
+        reader.release()
+
+
+def test_exiting_attacher_does_not_unlink_the_segment(ring):
+    code = f"from shm_audio import AudioRing; r = AudioRing.attach(**{ring.spec()!r}); r.write([7]); r.release()"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.abspath(shm_audio.__file__)))
+    time.sleep(0.2)  # the child's resource tracker cleans up after the child exits
+    again = AudioRing.attach(**ring.spec())
+    try:
+        with again.reading() as audio:
+            assert list(audio) == [7]
+    finally:
+        again.release()
@@ -0,0 +1,64 @@
+"""Dropping late audio (the server's SCHED_DROP_LAG_SEC) must keep timestamps absolute: the processor restarts
+where the kept audio starts on the stream timeline, after the buffered audio and the skipped samples."""
+
+import numpy as np
+import pytest
+
+from whisper_online import SAMPLING_RATE, FasterWhisperASR, OnlineASRProcessor
+
+MIN_CHUNK = 1.0
+
+
+class _Segment:
+    def __init__(self, words):
+        self.words = words
+        self.start, self.end = words[0].start, words[-1].end
+        self.no_speech_prob = 0.0
+
+
+class _Word:
+    def __init__(self, start, end, word):
+        self.start, self.end, self.word = start, end, word
+
+
+class SecondsASR(FasterWhisperASR):
+    """One word per whole second of audio, named after the sample value at its start (the stream second)."""
+
+    def __init__(self):
+        self.transcribe_kargs = {}
+        self.original_language = "en"
+
+    def transcribe(self, audio, init_prompt="", **decode_options):
+        words = [
+            _Word(i + 0.1, i + 0.9, f" s{round(audio[i * SAMPLING_RATE] * 1000)}")
+            for i in range(len(audio) // SAMPLING_RATE)
+        ]
+        return [_Segment(words[i : i + 3]) for i in range(0, len(words), 3)]
+
+
+def stream_seconds(first, count):
+    """Audio whose sample values encode the stream second they belong to (second n -> n / 1000)."""
+    return np.repeat(np.arange(first, first + count, dtype=np.float32) / 1000, SAMPLING_RATE)
+
+
+def test_drop_restarts_after_the_buffered_audio():
+    proc = OnlineASRProcessor(SecondsASR())
+    for second in range(10):
+        proc.insert_audio_chunk(stream_seconds(second, 1))
+        proc.process_iter()
+
+    late = stream_seconds(10, 20)  # the server fell behind: 20 s arrive at once, only the newest min_chunk is kept
+    drop = len(late) - int(MIN_CHUNK * SAMPLING_RATE)
+    proc.skip_ahead(drop / SAMPLING_RATE)
+    assert proc.buffer_time_offset == pytest.approx(29.0)
+
+    proc.insert_audio_chunk(late[drop:])
+    out = [proc.process_iter()]
+    for second in range(30, 33):
+        proc.insert_audio_chunk(stream_seconds(second, 1))
+        out.append(proc.process_iter())
+    out.append(proc.finish())
+    out = [o for o in out if o[0] is not None]
+    assert " ".join(o[2] for o in out).split() == ["s29", "s30", "s31", "s32"]
+    assert out[0][0] == pytest.approx(29.1)
+    assert out[-1][1] == pytest.approx(32.9)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Offline (batch) transcription of audio files for archive backfill.
+
+Unlike the live server this is throughput oriented: each file is decoded in one read, split at
+silence boundaries into independent chunks (<= --max-chunk-sec), and chunks are transcribed in
+batches across a process pool (one model per worker), several files at a time. Output uses the same JSON line schema as the
+server (language, start, end, text) plus optional SRT / WebVTT.
+
+Usage:
+  python whisper_offline.py recording.wav [more files or directories ...] --model small --workers 4
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import datetime
+import logging
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from whisper_online import (
+    SAMPLING_RATE,
+    add_shared_args,
+    asr_factory,
+    check_shared_args,
+    set_logging,
+    silence_spans,
+    timedelta_to_webvtt,
+    transcript_json,
+)
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3", ".ogg", ".opus", ".pcm", ".raw", ".s16le")
+RAW_PCM_EXTENSIONS = (".pcm", ".raw", ".s16le")  # headerless 16 kHz mono PCM16LE (same as the server input)
+OUTPUT_FORMATS = ("json", "srt", "vtt")
+FILES_AHEAD_BATCHES = 2  # batches queued per worker; further files are loaded once earlier ones are written
+
+# per worker process: (asr, args) set by _init_worker
+_worker = None
+
+
+def load_audio(path):
+    """Reads a whole file into a float32 mono array at SAMPLING_RATE (bulk read, no streaming)."""
+    if path.lower().endswith(RAW_PCM_EXTENSIONS):
+        audio = np.fromfile(path, dtype="<i2").astype(np.float32)
+        audio *= 1.0 / 32768.0
+        return audio
+    import soundfile as sf
+
+    audio, sr = sf.read(path, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+    if sr != SAMPLING_RATE:
+        # linear interpolation keeps the dependency set small; resample upstream (ffmpeg) for best quality
+        logger.debug(f"Resampling {path} from {sr} Hz")
+        n = int(round(len(audio) * SAMPLING_RATE / sr))
+        audio = np.interp(np.arange(n) * (sr / SAMPLING_RATE), np.arange(len(audio)), audio).astype(np.float32)
+    return np.ascontiguousarray(audio)
+
+
+def split_at_silence(audio, max_chunk_sec, min_silence_sec=0.5):
+    """Splits audio into independent chunks of at most max_chunk_sec, cutting in the middle of the last
+    silence before the limit (hard cut if there is none). Chunks that are entirely silence are skipped.
+    Returns [(beg_sample, end_sample), ...].
+    """
+    spans = silence_spans(audio, min_silence_sec=min_silence_sec)
+    max_len = int(max_chunk_sec * SAMPLING_RATE)
+    min_len = max_len // 4  # avoid many tiny chunks when pauses are frequent
+    chunks = []
+    beg = 0
+    while beg < len(audio):
+        end = len(audio)
+        if end - beg > max_len:
+            cuts = [(b + e) // 2 for b, e in spans if beg + min_len < (b + e) // 2 <= beg + max_len]
+            end = cuts[-1] if cuts else beg + max_len
+        if not any(b <= beg and end <= e for b, e in spans):
+            chunks.append((beg, end))
+        beg = end
+    return chunks
+
+
+def _init_worker(args):
+    global _worker
+    logging.basicConfig(format="%(levelname)s\t%(message)s")
+    logging.getLogger("whisper_online").setLevel(args.log_level)
+    asr, _ = asr_factory(args)
+    _worker = SimpleNamespace(asr=asr, args=args)
+
+
+def _transcribe_batch(batch):
+    """batch: [(offset_sec, audio), ...] -> [[(beg, end, text), ...] per chunk] with absolute timestamps."""
+    asr = _worker.asr
+    out = []
+    for offset, audio in batch:
+        segments = asr.transcribe(audio, profile=_worker.args.decode_profile)
+        out.append([(offset + b, offset + e, t) for b, e, t in asr.ts_segments(segments)])
+    return out
+
+
+def vtt_time(seconds):
+    return timedelta_to_webvtt(str(datetime.timedelta(seconds=seconds)))
+
+
+def srt_time(seconds):
+    return vtt_time(seconds).replace(".", ",")
+
+
+def write_outputs(segments, base, formats, language):
+    if "json" in formats:
+        with open(base + ".jsonl", "w", encoding="utf-8") as f:
+            for beg, end, text in segments:
+                f.write(transcript_json(beg, end, text, language) + "\n")
+    if "srt" in formats:
+        with open(base + ".srt", "w", encoding="utf-8") as f:
+            for i, (beg, end, text) in enumerate(segments, 1):
+                f.write(f"{i}\n{srt_time(beg)} --> {srt_time(end)}\n{text.strip()}\n\n")
+    if "vtt" in formats:
+        with open(base + ".vtt", "w", encoding="utf-8") as f:
+            f.write("WEBVTT\n\n")
+            for beg, end, text in segments:
+                f.write(f"{vtt_time(beg)} --> {vtt_time(end)}\n{text.strip()}\n\n")
+
+
+def find_audio_files(paths):
+    """Yields (path, name): name is the path relative to the directory argument it was found in (the file name
+    for file arguments), mirrored below --output-dir."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        full = os.path.join(root, name)
+                        yield full, os.path.relpath(full, path)
+        else:
+            yield path, os.path.basename(path)
+
+
+def output_base(path, name, output_dir):
+    """Output path without the format suffix. The input extension is kept (x.wav -> x.wav.jsonl) so x.wav and
+    x.mp3 next to each other do not write the same files."""
+    if output_dir:
+        return os.path.join(output_dir, name)
+    return path
+
+
+def transcribe_files(files, submit, args):
+    """Transcribes [(path, name), ...]. The chunk batches of several files are queued on the workers at once,
+    so short recordings (one chunk each) keep all of them busy; outputs are written in input order."""
+    pending = collections.deque()  # (path, base, duration, chunk count, start time, [futures])
+    queued = 0
+    t0, total = time.time(), 0.0
+
+    def finish_oldest():
+        nonlocal queued
+        path, base, duration, n_chunks, t, futures = pending.popleft()
+        queued -= len(futures)
+        segments = [seg for future in futures for chunk in future.result() for seg in chunk]
+        os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+        write_outputs(segments, base, args.formats, args.lan)
+        logger.info(
+            f"{path}: {duration:.1f}s audio, {n_chunks} chunks, {len(segments)} segments in {time.time() - t:.1f}s"
+        )
+
+    for path, name in files:
+        while pending and queued >= FILES_AHEAD_BATCHES * args.workers:
+            finish_oldest()
+        t = time.time()
+        audio = load_audio(path)
+        duration = len(audio) / SAMPLING_RATE
+        total += duration
+        chunks = split_at_silence(audio, args.max_chunk_sec)
+        jobs = [(b / SAMPLING_RATE, audio[b:e]) for b, e in chunks]
+        futures = [
+            submit(_transcribe_batch, jobs[i : i + args.batch_size]) for i in range(0, len(jobs), args.batch_size)
+        ]
+        pending.append((path, output_base(path, name, args.output_dir), duration, len(chunks), t, futures))
+        queued += len(futures)
+    while pending:
+        finish_oldest()
+    e = time.time() - t0
+    logger.info(f"{len(files)} files, {total:.1f}s audio in {e:.1f}s ({total / e if e > 0 else 0:.1f}x real time)")
+
+
+def output_collisions(files, output_dir):
+    """Groups of input paths that map to the same output base (e.g. a/x.wav and b/x.wav as file arguments)."""
+    by_base = collections.defaultdict(list)
+    for path, name in files:
+        by_base[os.path.normpath(os.path.abspath(output_base(path, name, output_dir)))].append(path)
+    return [paths for paths in by_base.values() if len(paths) > 1]
+
+
+def _run_now(fn, arg):
+    """In-process stand-in for pool.submit() with --workers 1."""
+    future = concurrent.futures.Future()
+    future.set_result(fn(arg))
+    return future
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Audio files or directories (searched recursively).")
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default=None,
+        help="Output directory, mirroring the paths below directory arguments (default: next to input).",
+    )
+    parser.add_argument(
+        "--formats",
+        type=lambda v: v.split(","),
+        default=["json"],
+        help=f"Comma-separated output formats from {','.join(OUTPUT_FORMATS)} (default: json).",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each loads its own model.")
+    parser.add_argument("--batch-size", type=int, default=4, help="Chunks sent to a worker per task.")
+    parser.add_argument(
+        "--max-chunk-sec", type=float, default=30.0, help="Upper bound of a chunk (split at silence below it)."
+    )
+    add_shared_args(parser)
+    args = parser.parse_args(argv)
+    set_logging(args, logger, other="")
+
+    if args.backend != "faster-whisper":
+        parser.error("offline mode supports only --backend faster-whisper")
+    check_shared_args(parser, args)
+    unknown = [f for f in args.formats if f not in OUTPUT_FORMATS]
+    if unknown:
+        parser.error(f"unknown output format(s): {','.join(unknown)}")
+    files = list(find_audio_files(args.paths))
+    if not files:
+        parser.error("no audio files found")
+    collisions = output_collisions(files, args.output_dir)
+    if collisions:
+        parser.error("inputs would write the same output files: " + "; ".join(" and ".join(c) for c in collisions))
+
+    if args.workers <= 1:
+        _init_worker(args)
+        transcribe_files(files, _run_now, args)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(args,)
+    ) as pool:
+        transcribe_files(files, pool.submit, args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -3,7 +3,10 @@
 ## This code and all components (c) Copyright 2006 - 2025, Wowza Media Systems, LLC. All rights reserved.
 ## This code is licensed pursuant to the Wowza Public License version 1.0, available at www.wowza.com/legal.
 ##
+import bisect
+import datetime
 import io
+import json
 import logging
 import math
 import os
@@ -11,13 +14,27 @@ import sys
 import time
 
 import numpy as np
-import soundfile as sf  # still needed for OpenAI API buffer encoding
+
+import stage_trace
 
 logger = logging.getLogger(__name__)
 SAMPLING_RATE = 16000  # default
 
 """Core ASR backend classes and streaming processor (server usage)."""
 
+# Decoding profiles (FasterWhisperASR), most accurate first. "accurate" is the original fixed setting
+# (beam 5 with the library's temperature fallback); faster rungs narrow the beam, shorten or drop the
+# temperature fallback (each fallback is a full re-decode) and stop conditioning on previous text.
+# "draft" decodes greedily with the smaller --draft-model and is only offered when one is loaded.
+DECODE_PROFILES = {
+    "accurate": dict(
+        beam_size=5, best_of=5, temperature=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0], condition_on_previous_text=True
+    ),
+    "balanced": dict(beam_size=3, best_of=3, temperature=[0.0, 0.4, 0.8], condition_on_previous_text=True),
+    "fast": dict(beam_size=1, best_of=1, temperature=0.0, condition_on_previous_text=False),
+    "draft": dict(beam_size=1, best_of=1, temperature=0.0, condition_on_previous_text=False),
+}
+
 # Whisper backend
 
 
@@ -46,11 +63,16 @@ class ASRBase:
     def use_vad(self):
         raise NotImplementedError("must be implemented in the child class")
 
+    def decode_profiles(self):
+        """Profile names this backend honours, most accurate first (see DECODE_PROFILES)."""
+        return ["accurate"]
+
 
 class FasterWhisperASR(ASRBase):
     """Uses faster-whisper library as the backend. Works much faster, appx 4-times (in offline mode). For GPU, it requires installation with a specific CUDNN version."""
 
     transcription_separator = ""
+    draft_model = None  # smaller model used by the "draft" profile (load_draft_model)
 
     def load_model(self, model=None, cache_dir=None, use_gpu=False):
         from faster_whisper import WhisperModel
@@ -71,17 +93,26 @@ class FasterWhisperASR(ASRBase):
             model = WhisperModel(model, device="cpu", compute_type="int8", download_root=cache_dir)
         return model
 
-    def transcribe(self, audio, init_prompt=""):
+    def load_draft_model(self, model, cache_dir=None, use_gpu=False):
+        self.draft_model = self.load_model(model, cache_dir, use_gpu)
+
+    def decode_profiles(self):
+        return [p for p in DECODE_PROFILES if p != "draft" or self.draft_model is not None]
+
+    def transcribe(self, audio, init_prompt="", profile="accurate", **decode_options):
+        """profile: name in DECODE_PROFILES; decode_options: per-call overrides on top of it (e.g. a smaller
+        beam_size under load)."""
 
         # tested: beam_size=5 is faster and better than 1 (on one 200 second document from En ESIC, min chunk 0.01)
-        segments, info = self.model.transcribe(
+        options = dict(DECODE_PROFILES[profile], word_timestamps=True)
+        options.update(self.transcribe_kargs)
+        options.update(decode_options)
+        model = self.draft_model if profile == "draft" and self.draft_model is not None else self.model
+        segments, info = model.transcribe(
             audio,
             language=self.original_language,
             initial_prompt=init_prompt,
-            beam_size=5,
-            word_timestamps=True,
-            condition_on_previous_text=True,
-            **self.transcribe_kargs,
+            **options,
         )
         # print(info)  # info contains language detection result
 
@@ -99,6 +130,10 @@ class FasterWhisperASR(ASRBase):
                 o.append(t)
         return o
 
+    def ts_segments(self, segments):
+        """[(beg, end, "segment text"), ...] skipping no-speech segments (offline mode output granularity)."""
+        return [(s.start, s.end, s.text) for s in segments if s.no_speech_prob <= 0.9]
+
     def segments_end_ts(self, res):
         return [s.end for s in res]
 
@@ -156,6 +191,8 @@ class OpenaiApiASR(ASRBase):
         return [s.end for s in res.words]
 
     def transcribe(self, audio_data, prompt=None, *args, **kwargs):
+        import soundfile as sf  # only needed for OpenAI API buffer encoding; imported lazily
+
         # Write the audio data to a buffer
         buffer = io.BytesIO()
         buffer.name = "temp.wav"
@@ -261,6 +298,15 @@ class HypothesisBuffer:
     def complete(self):
         return self.buffer
 
+    SNAPSHOT_FIELDS = ("commited_in_buffer", "buffer", "new", "last_commited_time", "last_commited_word")
+
+    def snapshot(self):
+        return {k: list(v) if isinstance(v, list) else v for k, v in vars(self).items() if k in self.SNAPSHOT_FIELDS}
+
+    def restore(self, state):
+        for k in self.SNAPSHOT_FIELDS:
+            setattr(self, k, list(state[k]) if isinstance(state[k], list) else state[k])
+
 
 # Fixed trimming threshold (seconds) for completed segments.
 # Rationale: 15s provides a stable context window larger than the target end-to-end latency (~10s delay use case)
@@ -269,30 +315,83 @@ class HypothesisBuffer:
 SEGMENT_TRIM_SEC = 15  # DO NOT expose as CLI/env without explicit approval.
 
 
+# Silence compaction (optional, --compact-silence): silences of at least COMPACT_MIN_SILENCE_SEC are cut from the
+# audio handed to transcribe(), keeping COMPACT_KEEP_SEC on each side so word edges are not clipped. Word and
+# segment timestamps are mapped back to buffer time before they reach HypothesisBuffer / trimming.
+COMPACT_MIN_SILENCE_SEC = 1.0
+COMPACT_KEEP_SEC = 0.2
+
+
 class OnlineASRProcessor:
 
-    def __init__(self, asr, logfile=sys.stderr):
+    def __init__(self, asr, logfile=sys.stderr, compact_silence=False, buffer_dtype="float32"):
         """Simplified processor: always segment-based trimming with fixed 15s window.
         asr: backend ASR instance
         logfile: stream for logging
+        compact_silence: cut long silences from the audio sent to the model (timestamps are remapped)
+        buffer_dtype: "float32" or "int16" storage of the rolling audio buffer; int16 halves its memory and is
+            converted to a float32 scratch copy only for transcribe
         """
         self.asr = asr
         self.logfile = logfile
+        self.compact_silence = compact_silence
+        self.buffer_dtype = np.dtype(buffer_dtype)
+        if self.buffer_dtype not in (np.float32, np.int16):
+            raise ValueError(f"unsupported buffer_dtype {buffer_dtype!r} (float32 or int16)")
+        # profile= and per-call overrides passed to asr.transcribe (the server adapts them to load)
+        self.decode_options = {}
         self.init()
 
     def init(self, offset=None):
         """run this when starting or restarting processing"""
-        self.audio_buffer = np.array([], dtype=np.float32)
+        self.audio_buffer = np.array([], dtype=self.buffer_dtype)
         self.transcript_buffer = HypothesisBuffer(logfile=self.logfile)
         self.buffer_time_offset = 0
         if offset is not None:
             self.buffer_time_offset = offset
         self.transcript_buffer.last_commited_time = self.buffer_time_offset
         self.commited = []
+        self.time_index = None  # (cut points in compacted time, cumulative shift) of the last compaction
+
+    def snapshot(self):
+        """Picklable processing state (audio buffer, hypothesis, committed history, time offset) for resuming
+        the stream later with restore(); the audio is stored as int16 (the wire format, lossless)."""
+        audio = self.audio_buffer
+        if audio.dtype != np.int16:
+            audio = np.clip(np.rint(audio * 32768.0), -32768, 32767).astype(np.int16)
+        return {
+            "audio_buffer": audio,
+            "buffer_time_offset": self.buffer_time_offset,
+            "commited": list(self.commited),
+            "transcript_buffer": self.transcript_buffer.snapshot(),
+        }
+
+    def restore(self, state):
+        """Continue from a snapshot() instead of init(): same timeline, prompt and hypothesis."""
+        self.init(offset=state["buffer_time_offset"])
+        self.insert_audio_chunk(state["audio_buffer"])
+        self.commited = list(state["commited"])
+        self.transcript_buffer.restore(state["transcript_buffer"])
 
     def insert_audio_chunk(self, audio):
+        """audio: int16 PCM samples or floats in [-1,1] (any float dtype); stored as buffer_dtype."""
+        if audio.dtype != self.buffer_dtype:
+            if audio.dtype == np.int16:
+                audio = audio.astype(np.float32) * np.float32(1.0 / 32768.0)
+            elif self.buffer_dtype == np.int16:
+                audio = np.clip(np.rint(audio * 32768.0), -32768, 32767).astype(np.int16)
+            else:
+                audio = audio.astype(np.float32)
         self.audio_buffer = np.append(self.audio_buffer, audio)
 
+    def audio_view(self):
+        """The audio buffer as float32 for the model (a scratch copy when stored as int16)."""
+        if self.buffer_dtype == np.float32:
+            return self.audio_buffer
+        audio = self.audio_buffer.astype(np.float32)
+        audio *= 1.0 / 32768.0
+        return audio
+
     def prompt(self):
         """Returns a tuple: (prompt, context), where "prompt" is a 200-character suffix of commited text that is inside of the scrolled away part of audio buffer.
         "context" is the commited text that is inside the audio buffer. It is transcribed again and skipped. It is returned only for debugging and logging reasons.
@@ -320,19 +419,30 @@ class OnlineASRProcessor:
         The non-emty text is confirmed (committed) partial transcript.
         """
 
-        prompt, non_prompt = self.prompt()
+        with stage_trace.span("prompt"):
+            prompt, non_prompt = self.prompt()
         logger.debug(f"PROMPT: {prompt}")
         logger.debug(f"CONTEXT: {non_prompt}")
         logger.debug(
             f"transcribing {len(self.audio_buffer)/SAMPLING_RATE:2.2f} seconds from {self.buffer_time_offset:2.2f}"
         )
-        res = self.asr.transcribe(self.audio_buffer, init_prompt=prompt)
+        audio, self.time_index = self.audio_view(), None
+        if self.compact_silence:
+            with stage_trace.span("compact_audio"):
+                audio, self.time_index = self.compact_audio(audio)
+        with stage_trace.span("transcribe"):
+            res = self.asr.transcribe(audio, init_prompt=prompt, **self.decode_options)
 
         # transform to [(beg,end,"word1"), ...]
-        tsw = self.asr.ts_words(res)
-
-        self.transcript_buffer.insert(tsw, self.buffer_time_offset)
-        o = self.transcript_buffer.flush()
+        with stage_trace.span("ts_words"):
+            tsw = self.asr.ts_words(res)
+            if self.time_index is not None:
+                tsw = [(self.to_buffer_time(a), self.to_buffer_time(b, end=True), w) for a, b, w in tsw]
+
+        with stage_trace.span("insert"):
+            self.transcript_buffer.insert(tsw, self.buffer_time_offset)
+        with stage_trace.span("flush"):
+            o = self.transcript_buffer.flush()
         self.commited.extend(o)
         completed = self.to_flush(o)
         logger.debug(f">>>>COMPLETE NOW: {completed}")
@@ -341,17 +451,48 @@ class OnlineASRProcessor:
 
         # segment-based trimming only
         if len(self.audio_buffer) / SAMPLING_RATE > SEGMENT_TRIM_SEC:
-            self.chunk_completed_segment(res)
+            with stage_trace.span("chunk_completed_segment"):
+                self.chunk_completed_segment(res)
             logger.debug("chunking segment")
 
         logger.debug(f"len of buffer now: {len(self.audio_buffer)/SAMPLING_RATE:2.2f}")
         return self.to_flush(o)
 
+    def compact_audio(self, audio):
+        """Returns (audio, time_index): audio (float32 buffer view) with long silences cut out, and the index
+        mapping compacted time back to buffer time (None if nothing was cut)."""
+        keep = int(COMPACT_KEEP_SEC * SAMPLING_RATE)
+        pieces, points, shifts = [], [], []
+        pos = removed = 0
+        for b, e in silence_spans(audio, min_silence_sec=COMPACT_MIN_SILENCE_SEC):
+            cut_beg, cut_end = b + keep, e - keep
+            if cut_end <= cut_beg:
+                continue
+            pieces.append(audio[pos:cut_beg])
+            removed += cut_end - cut_beg
+            pos = cut_end
+            points.append((cut_end - removed) / SAMPLING_RATE)
+            shifts.append(removed / SAMPLING_RATE)
+        if not pieces:
+            return audio, None
+        pieces.append(audio[pos:])
+        logger.debug(f"compacted {removed/SAMPLING_RATE:2.2f} seconds of silence in {len(points)} cuts")
+        return np.concatenate(pieces), (points, shifts)
+
+    def to_buffer_time(self, t, end=False):
+        """Maps a compacted-audio timestamp to buffer time. A timestamp exactly at a cut belongs to the audio
+        before the cut if it is an end time, after the cut if it is a start time."""
+        points, shifts = self.time_index
+        i = (bisect.bisect_left(points, t) if end else bisect.bisect_right(points, t)) - 1
+        return t if i < 0 else t + shifts[i]
+
     def chunk_completed_segment(self, res):
         if self.commited == []:
             return
 
         ends = self.asr.segments_end_ts(res)
+        if self.time_index is not None:
+            ends = [self.to_buffer_time(e, end=True) for e in ends]
 
         t = self.commited[-1][1]
 
@@ -386,6 +527,15 @@ class OnlineASRProcessor:
         self.buffer_time_offset += len(self.audio_buffer) / SAMPLING_RATE
         return f
 
+    def skip_ahead(self, seconds):
+        """Flush like finish() and restart processing `seconds` after the end of the buffered audio, for audio
+        that was received but is dropped instead of inserted. Timestamps of later audio stay absolute.
+        Returns: the flushed text, the same format as self.process_iter()
+        """
+        f = self.finish()  # moves buffer_time_offset to the end of the buffered audio
+        self.init(offset=self.buffer_time_offset + seconds)
+        return f
+
     def to_flush(
         self,
         sentences,
@@ -407,6 +557,56 @@ class OnlineASRProcessor:
         return (b, e, t)
 
 
+def timedelta_to_webvtt(delta):
+    """Formats str(datetime.timedelta) as HH:MM:SS.mmm (WebVTT cue timestamp).
+    Format this:0:00:00
+    Format this:0:00:09.480000
+    """
+    parts = delta.split(":")
+    parts2 = parts[2].split(".")
+
+    final_data = "{:02d}".format(int(parts[0])) + ":"
+    final_data += "{:02d}".format(int(parts[1])) + ":"
+    final_data += "{:02d}".format(int(parts2[0])) + "."
+    if len(parts2) == 1:
+        final_data += "000"
+    else:
+        final_data += "{:03d}".format(int(int(parts2[1]) / 1000))
+    return final_data
+
+
+def transcript_json(beg, end, text, language):
+    """One output line of the (frozen) protocol: keys language, start, end, text in this order."""
+    data = {}
+    # language field: use provided --lan unless 'auto', then fallback to 'en'
+    if language and language != "auto":
+        data["language"] = language
+    else:
+        data["language"] = "en"
+    data["start"] = "%1.3f" % datetime.timedelta(seconds=beg).total_seconds()
+    data["end"] = "%1.3f" % datetime.timedelta(seconds=end).total_seconds()
+    data["text"] = text.strip()
+    return json.dumps(data)
+
+
+def silence_spans(audio, min_silence_sec=0.5, frame_sec=0.03, threshold_db=-40.0):
+    """Energy-based silence detection (no extra VAD dependency).
+    Returns [(beg_sample, end_sample), ...] of stretches of at least min_silence_sec whose
+    frame RMS stays below threshold_db (dBFS).
+    """
+    frame = max(1, int(frame_sec * SAMPLING_RATE))
+    n = len(audio) // frame
+    if n == 0:
+        return []
+    frames = np.asarray(audio[: n * frame], dtype=np.float32).reshape(n, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    silent = rms < 10 ** (threshold_db / 20)
+    # run boundaries of the boolean mask
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.view(np.int8), [0]))))
+    min_frames = int(math.ceil(min_silence_sec / frame_sec))
+    return [(b * frame, e * frame) for b, e in zip(edges[::2], edges[1::2]) if e - b >= min_frames]
+
+
 def add_shared_args(parser):
     """Shared args for server.
     parser: argparse.ArgumentParser object
@@ -449,6 +649,7 @@ def add_shared_args(parser):
     parser.add_argument(
         "--vad", action="store_true", default=True, help="Use VAD = voice activity detection (default: enabled)."
     )
+    parser.add_argument("--no-vad", dest="vad", action="store_false", help="Disable the VAD filter.")
     parser.add_argument(
         "-l",
         "--log-level",
@@ -461,6 +662,44 @@ def add_shared_args(parser):
     parser.add_argument(
         "--disable_gpu", action="store_true", default=False, help="Force disable GPU even if USE_GPU env is set"
     )
+    parser.add_argument(
+        "--compact-silence",
+        action="store_true",
+        default=False,
+        help="Cut long silences (>= 1s) from the audio buffer before each transcribe call; timestamps are mapped "
+        "back. Mostly useful with --no-vad (the VAD filter already skips silence).",
+    )
+    parser.add_argument(
+        "--buffer-dtype",
+        type=str,
+        default="float32",
+        choices=["float32", "int16"],
+        help="Storage type of the rolling audio buffer. int16 (the wire format) halves buffer memory; converted to "
+        "float32 only at transcribe time.",
+    )
+    parser.add_argument(
+        "--decode-profile",
+        type=str,
+        default="accurate",
+        choices=list(DECODE_PROFILES),
+        help="Decoding profile (beam size, best_of, temperature fallback). With adaptive profiles on the server "
+        "this is the most accurate one a session uses.",
+    )
+    parser.add_argument(
+        "--draft-model",
+        type=str,
+        default=None,
+        help="Smaller model (e.g. tiny, base) loaded next to --model for the 'draft' decoding profile.",
+    )
+
+
+def check_shared_args(parser, args):
+    """Rejects option combinations that asr_factory() could only refuse after loading the model."""
+    if args.backend != "faster-whisper":
+        if args.decode_profile != "accurate" or args.draft_model:
+            parser.error("--decode-profile and --draft-model need --backend faster-whisper")
+    elif args.decode_profile == "draft" and not args.draft_model:
+        parser.error("--decode-profile draft needs --draft-model")
 
 
 def asr_factory(args, logfile=sys.stderr):
@@ -497,6 +736,15 @@ def asr_factory(args, logfile=sys.stderr):
         asr = FasterWhisperASR(model=model, lan=args.lan, cache_dir=args.model_cache_dir, use_gpu=use_gpu)
         e = time.time()
         logger.info(f"done. It took {round(e-t,2)} seconds.")
+        if getattr(args, "draft_model", None):
+            t = time.time()
+            logger.info(f"Loading draft model {args.draft_model}...")
+            asr.load_draft_model(args.draft_model, cache_dir=args.model_cache_dir, use_gpu=use_gpu)
+            logger.info(f"done. It took {round(time.time()-t,2)} seconds.")
+
+    profile = getattr(args, "decode_profile", "accurate")
+    if profile not in asr.decode_profiles():  # check_shared_args() reports this before loading
+        raise ValueError(f"--decode-profile {profile} is not available with this backend / without --draft-model")
 
     # Apply common configurations
     if getattr(args, "vad", False):  # Checks if VAD argument is present and True
@@ -511,11 +759,23 @@ def asr_factory(args, logfile=sys.stderr):
         tgt_language = language  # Whisper transcribes in this language
 
     # Create the OnlineASRProcessor
-    online = OnlineASRProcessor(asr, logfile=logfile)
+    online = online_factory(asr, args, logfile=logfile)
 
     return asr, online
 
 
+def online_factory(asr, args, logfile=sys.stderr):
+    """Creates an OnlineASRProcessor for a (shared) ASR instance with the processor options from args."""
+    online = OnlineASRProcessor(
+        asr,
+        logfile=logfile,
+        compact_silence=getattr(args, "compact_silence", False),
+        buffer_dtype=getattr(args, "buffer_dtype", "float32"),
+    )
+    online.decode_options = {"profile": getattr(args, "decode_profile", "accurate")}
+    return online
+
+
 def set_logging(args, logger, other="_server"):
     logging.basicConfig(format="%(levelname)s\t%(message)s")  # format='%(name)s
     logger.setLevel(args.log_level)
@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
+import time
+
+STARTUP_T0 = time.time()  # before heavy imports, for the startup phase report
+
 import argparse
+import base64
+import collections
+import contextlib
 import datetime
+import hashlib
+import heapq
+import itertools
 import json
 import logging
 import os
+import pickle
+import re
+import select
 import signal
 import sys
+import threading
 import warnings
 from typing import Optional, Union
 
@@ -14,6 +28,7 @@ import numpy as np
 from whisper_online import *
 
 logger = logging.getLogger(__name__)
+startup_phases = {"imports": round(time.time() - STARTUP_T0, 3)}
 
 # Suppress noisy pkg_resources deprecation warning (ctranslate2 dependency path)
 # Toggle with SUPPRESS_PKG_RES_WARN=0 to re-enable.
@@ -28,6 +43,7 @@ parser.add_argument("--port", type=int, default=3000)
 # options from whisper_online
 add_shared_args(parser)
 args = parser.parse_args()
+check_shared_args(parser, args)
 
 set_logging(args, logger, other="")
 
@@ -39,7 +55,12 @@ shutdown_logged = False
 SAMPLING_RATE = args.sampling_rate
 # Removed unused local aliases (size, min_chunk) to reduce namespace noise.
 language = args.lan
-asr, online = asr_factory(args)
+
+# EARLY_LISTEN=1: bind and listen right away and load + warm up the model in a background thread. Clients that
+# connect meanwhile are accepted and their audio is buffered; processing starts once the model is ready.
+EARLY_LISTEN = os.environ.get("EARLY_LISTEN", "0") == "1"
+model_ready = threading.Event()
+asr, online = None, None
 
 # Sanity warning: if min_chunk_size exceeds fixed segment trim window (15s),
 # initial transcripts may be delayed indefinitely. Log once.
@@ -53,16 +74,63 @@ if args.min_chunk_size > _SEGMENT_TRIM_SEC:
         f"({_SEGMENT_TRIM_SEC}s); this can delay first transcript emission. Consider lowering it."
     )
 
-# Warm-up: run a short silent buffer through model so first real chunk is faster
-try:
-    if args.backend == "faster-whisper":
-        silent = np.zeros(int(SAMPLING_RATE * 0.5), dtype=np.float32)  # 0.5s silence
-        asr.transcribe(silent)
-        logger.info("Model warm-up with generated silence complete.")
-    else:
-        logger.debug("Skipping local warm-up for non local backend.")
-except Exception as e:
-    logger.warning(f"Warm-up failed (continuing without): {e}")
+
+def load_model():
+    """Load the backend (its modules are imported only here) and warm it up; sets model_ready."""
+    global asr, online
+    t = time.time()
+    asr, online = asr_factory(args)
+    startup_phases["model_load"] = round(time.time() - t, 3)
+
+    # Warm-up: run a short silent buffer through model so first real chunk is faster
+    t = time.time()
+    try:
+        if args.backend == "faster-whisper":
+            silent = np.zeros(int(SAMPLING_RATE * 0.5), dtype=np.float32)  # 0.5s silence
+            asr.transcribe(silent)
+            logger.info("Model warm-up with generated silence complete.")
+        else:
+            logger.debug("Skipping local warm-up for non local backend.")
+    except Exception as e:
+        logger.warning(f"Warm-up failed (continuing without): {e}")
+    model_ready.set()
+    startup_phase_done("warm_up", round(time.time() - t, 3))
+
+
+startup_lock = threading.Lock()
+
+
+def startup_phase_done(phase, seconds):
+    """Record a startup phase. The server is ready once the model is warm and the socket listens (whichever
+    comes last); the phases are logged once at that point."""
+    with startup_lock:
+        startup_phases[phase] = seconds
+        if "ready" not in startup_phases and "warm_up" in startup_phases and "listening" in startup_phases:
+            startup_phases["ready"] = round(time.time() - STARTUP_T0, 3)
+            log_startup_phases()
+
+
+def log_startup_phases():
+    order = ("imports", "model_load", "warm_up", "listening", "ready")
+    logger.info("Startup phases: " + ", ".join(f"{k} {startup_phases[k]:.2f}s" for k in order if k in startup_phases))
+
+
+def load_model_background():
+    global running
+    try:
+        load_model()
+    except Exception as e:
+        logger.error(f"Model load failed: {e}; shutting down")
+        running = False
+        if server_socket is not None:
+            try:
+                server_socket.close()
+            except OSError:
+                pass
+
+
+if not EARLY_LISTEN:
+    load_model()
 
 
 ######### Server objects
@@ -70,6 +138,7 @@ except Exception as e:
 import socket
 
 import line_packet
+import stage_trace
 
 # ---- Phase 6 internal constants & sentinels (no external behaviour change) ----
 NO_DATA_YET = object()  # temporary absence of data (timeout)
@@ -93,6 +162,187 @@ MAX_SINGLE_RECV_BYTES = int(os.environ.get("MAX_SINGLE_RECV_BYTES", str(5 * 1024
 DEFAULT_PACKET_SIZE_BYTES = 32000 * 5 * 60
 PACKET_SIZE_BYTES = int(os.environ.get("PACKET_SIZE_BYTES", str(DEFAULT_PACKET_SIZE_BYTES)))
 
+# Output stage: transcript lines go through a bounded per-connection queue drained by a writer thread,
+# so a slow/stalled consumer never blocks inference. On overflow either the oldest queued line is
+# dropped ("drop-oldest") or the client is disconnected ("disconnect").
+SEND_QUEUE_MAX_LINES = int(os.environ.get("SEND_QUEUE_MAX_LINES", "256"))
+SEND_OVERFLOW_POLICY = os.environ.get("SEND_OVERFLOW_POLICY", "drop-oldest")
+if SEND_OVERFLOW_POLICY not in ("drop-oldest", "disconnect"):
+    logger.warning(f"Unknown SEND_OVERFLOW_POLICY={SEND_OVERFLOW_POLICY!r}; using drop-oldest")
+    SEND_OVERFLOW_POLICY = "drop-oldest"
+# Upper bound for flushing queued lines when a session ends (final line after finish()).
+SEND_DRAIN_TIMEOUT_SEC = 5.0
+
+# Named sessions & transcript fan-out.
+#  - Every ingest session publishes its JSON lines under a name. Without a header the name is SESSION_NAME,
+#    so successive ingest connections feed the same subscribers.
+#  - SESSION_HEADER=1 lets an ingest client start with one text line "SESSION <name> [key=value ...]\n"
+#    before the raw PCM (opt-in; default input stays pure PCM).
+#  - SUBSCRIBE_PORT>0 opens a listener for read-only subscribers (raw TCP, WebSocket or Server-Sent Events)
+#    that receive the same lines; the last REPLAY_LINES lines are replayed to late joiners.
+SESSION_NAME = os.environ.get("SESSION_NAME", "default")
+SESSION_HEADER = os.environ.get("SESSION_HEADER", "0") == "1"
+SUBSCRIBE_PORT = int(os.environ.get("SUBSCRIBE_PORT", "0"))
+REPLAY_LINES = int(os.environ.get("REPLAY_LINES", "20"))
+SESSION_HEADER_MAGIC = b"SESSION "
+SESSION_HEADER_MAX_BYTES = 1024
+SESSION_NAME_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Concurrent sessions share one model; iterations are ordered by DeadlineScheduler.
+#  - MAX_SESSIONS: concurrently served ingest connections (1 = previous serial behaviour; others wait in backlog).
+#  - Priority class per session (header option priority=..., default SESSION_PRIORITY) sets its latency budget:
+#    how long a session may wait for the model once min_chunk of audio is ready (its deadline).
+#  - SCHED_DROP_LAG_SEC>0: a session whose audio waited longer than this after min_chunk was ready (queueing
+#    delay; the min_chunk accumulation itself is not counted) is hopelessly behind; all but the newest
+#    min_chunk of that audio is skipped (timestamps stay absolute). 0 disables dropping.
+MAX_SESSIONS = max(1, int(os.environ.get("MAX_SESSIONS", "1")))
+PRIORITY_BUDGET_SEC = {"high": 1.0, "normal": 2.0, "low": 4.0}
+SESSION_PRIORITY = os.environ.get("SESSION_PRIORITY", "normal")
+if SESSION_PRIORITY not in PRIORITY_BUDGET_SEC:
+    logger.warning(f"Unknown SESSION_PRIORITY={SESSION_PRIORITY!r}; using normal")
+    SESSION_PRIORITY = "normal"
+SCHED_DROP_LAG_SEC = float(os.environ.get("SCHED_DROP_LAG_SEC", "0"))
+
+# Admission control (each threshold 0 = off). The host counts as saturated when the shared model was busy
+# more than ADMIT_MAX_LOAD of the last ADMIT_WINDOW_SEC (aggregate real-time factor), when more than
+# ADMIT_MAX_QUEUE iterations wait for a turn, or when RSS exceeds ADMIT_MAX_RSS_MB. While saturated (or when
+# all MAX_SESSIONS slots are taken) new clients get one JSON line {"error": "overloaded", "retry_after": N}
+# and are closed. DEGRADE_BEAM_SIZE>0 additionally caps the beam size of existing sessions at that value until
+# load drops (a session whose decoding profile already uses a narrower beam keeps it).
+ADMIT_MAX_LOAD = float(os.environ.get("ADMIT_MAX_LOAD", "0"))
+ADMIT_MAX_QUEUE = int(os.environ.get("ADMIT_MAX_QUEUE", "0"))
+ADMIT_MAX_RSS_MB = float(os.environ.get("ADMIT_MAX_RSS_MB", "0"))
+ADMIT_WINDOW_SEC = 30.0
+RETRY_AFTER_SEC = int(os.environ.get("RETRY_AFTER_SEC", "30"))
+DEGRADE_BEAM_SIZE = int(os.environ.get("DEGRADE_BEAM_SIZE", "0"))
+DEGRADE_RECOVER_FRACTION = 0.8  # degraded decoding ends once every configured measure is below this share of its limit
+ADMISSION_ENABLED = bool(ADMIT_MAX_LOAD or ADMIT_MAX_QUEUE or ADMIT_MAX_RSS_MB)
+
+# Adaptive decoding profiles (0 = off: every session keeps --decode-profile). Each session measures the same
+# queueing delay as SCHED_DROP_LAG_SEC: how long its audio waited after MIN_CHUNK_SIZE of it was ready, i.e.
+# not counting the min_chunk accumulation itself (end-to-end latency is about min_chunk + this delay), so the
+# threshold does not depend on --min-chunk-size. Above ADAPTIVE_PROFILE_LAG_SEC it steps one rung to a faster
+# profile (accurate -> balanced -> fast -> draft, see whisper_online.DECODE_PROFILES),
+# below half of it one rung back, never above --decode-profile (header option profile= overrides per session).
+# After a switch the profile is held for ADAPTIVE_PROFILE_HOLD_SEC so one slow iteration does not flap it.
+# Keep it well below SCHED_DROP_LAG_SEC so sessions get faster before they start skipping audio.
+ADAPTIVE_PROFILE_LAG_SEC = float(os.environ.get("ADAPTIVE_PROFILE_LAG_SEC", "0"))
+ADAPTIVE_PROFILE_HOLD_SEC = float(os.environ.get("ADAPTIVE_PROFILE_HOLD_SEC", "10"))
+PROFILE_DECISIONS_KEPT = 20  # recent switches per session exported in /stats
+
+# Resumable sessions. With SESSION_RESUME_TTL_SEC>0, a session named via the header is checkpointed when its
+# client disconnects instead of being finished (the uncommitted tail is held back so it is not emitted twice).
+# A client reconnecting with "SESSION <name> resume=1" within the TTL continues from the snapshot: same
+# timestamps, prompt and hypothesis. SESSION_STORE_DIR keeps snapshots on local disk (they then also survive
+# a server restart); otherwise they are kept in memory.
+SESSION_RESUME_TTL_SEC = float(os.environ.get("SESSION_RESUME_TTL_SEC", "0"))
+SESSION_STORE_DIR = os.environ.get("SESSION_STORE_DIR", "")
+
+# Stage profiling (stage_trace): sampling rate from TRACE_SAMPLE_RATE (0 = off), switchable at runtime via
+# GET /trace?rate=<0..1> on SUBSCRIBE_PORT. TRACE_FILE: write the Chrome trace there on shutdown.
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+
+
+class LineWriter:
+    """Bounded output queue for one socket, drained by a writer thread.
+
+    put() never touches the socket: it appends to the queue (applying the overflow policy) and returns.
+    The writer thread takes everything pending and sends it as one coalesced write.
+    """
+
+    def __init__(
+        self, sock, max_lines=SEND_QUEUE_MAX_LINES, policy=SEND_OVERFLOW_POLICY, encode=None, owns_socket=False
+    ):
+        self.sock = sock
+        self.owns_socket = owns_socket  # close sock when the writer fails (subscribers: nobody else holds it)
+        self.encode = encode or line_packet.encode_line
+        self.trace_session = ""  # session name for trace spans of the writer thread
+        self.max_lines = max_lines
+        self.policy = policy
+        self.failed = False  # socket error or overflow disconnect; further put() raises BrokenPipeError
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self._pending = collections.deque()
+        self._closing = False
+        self._aborted = False
+        self._thread = threading.Thread(target=self._run, name="line-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, line):
+        with self._cond:
+            if self.failed:
+                raise BrokenPipeError("output stage closed")
+            if len(self._pending) >= self.max_lines:
+                if self.policy == "disconnect":
+                    self.failed = True
+                    self._aborted = True
+                    self._cond.notify()
+                    logger.warning(f"Send queue overflow ({self.max_lines} lines); disconnecting slow client")
+                    try:
+                        self.sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                    raise BrokenPipeError("send queue overflow")
+                self._pending.popleft()
+                self.dropped += 1
+                if self.dropped == 1:
+                    logger.warning(f"Send queue overflow ({self.max_lines} lines); dropping oldest lines")
+            self._pending.append(line)
+            self._cond.notify()
+
+    def close(self, timeout=SEND_DRAIN_TIMEOUT_SEC):
+        """Stop accepting lines and give the writer up to timeout seconds to drain the queue."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Output not drained within timeout; discarding pending lines")
+            self._aborted = True
+        if self.dropped:
+            logger.info(f"Dropped {self.dropped} transcript lines due to send queue overflow")
+
+    def _run(self):
+        try:
+            self._drain()
+        finally:
+            if self.owns_socket and self.failed:
+                try:
+                    self.sock.close()
+                except OSError:
+                    pass
+
+    def _drain(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closing or self._aborted)
+                if self._aborted or not self._pending:
+                    return
+                lines = list(self._pending)
+                self._pending.clear()
+            data = b"".join(self.encode(line) for line in lines)
+            stage_trace.sample(self.trace_session)
+            try:
+                with stage_trace.span("send"):
+                    self._send_all(data)
+            except OSError as e:
+                with self._cond:
+                    self.failed = True
+                    self._pending.clear()
+                logger.debug(f"Output write failed: {e}")
+                return
+
+    def _send_all(self, data):
+        # send() instead of sendall(): the socket has a recv timeout, and a timed-out sendall()
+        # would leave an unknown number of bytes written. Here a timeout just means "retry".
+        view = memoryview(data)
+        while view and not self._aborted:
+            try:
+                n = self.sock.send(view)
+            except socket.timeout:
+                continue
+            view = view[n:]
+
 
 class Connection:
     """it wraps conn object"""
@@ -105,14 +355,36 @@ class Connection:
         self.last_line = ""
         # Use timeout to distinguish inactivity from shutdown; keeps loop responsive
         self.conn.settimeout(CONN_RECV_TIMEOUT_SEC)
+        self.writer = LineWriter(conn)
+        self.pushback = b""  # bytes read ahead (session header probe) returned by the next receive
+        self.lost = False  # connection reset / broken pipe (no orderly end of stream)
 
     def send(self, line):
-        """it doesn't send the same line twice, because it was problematic in online-text-flow-events"""
+        """it doesn't send the same line twice, because it was problematic in online-text-flow-events
+        Queues the line for the writer thread; raises BrokenPipeError once the output stage has failed.
+        """
         if line == self.last_line:
             return
-        line_packet.send_one_line(self.conn, line)
+        self.writer.put(line)
         self.last_line = line
 
+    def close(self):
+        """Drain queued output (bounded), then close the socket."""
+        self.writer.close()
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+    def wait_readable(self, timeout=CONN_RECV_TIMEOUT_SEC):
+        """True once a receive would not block (data, end of stream or an error to report), False on timeout."""
+        if self.pushback:
+            return True
+        try:
+            return bool(select.select([self.conn], [], [], timeout)[0])
+        except (OSError, ValueError):
+            return True  # closed socket: the receive reports it
+
     def non_blocking_receive_audio(self):
         """Receive up to PACKET_SIZE bytes.
         Returns:
@@ -120,6 +392,9 @@ class Connection:
           NO_DATA_YET: timeout with no data (socket still open)
           STREAM_ENDED: remote closed/reset
         """
+        if self.pushback:
+            r, self.pushback = self.pushback, b""
+            return r
         try:
             r = self.conn.recv(self.PACKET_SIZE)
             if r == b"":  # remote orderly shutdown
@@ -132,8 +407,39 @@ class Connection:
         except socket.timeout:
             return NO_DATA_YET
         except ConnectionResetError:
+            self.lost = True
             return STREAM_ENDED
 
+    def read_session_header(self):
+        """Probe for the optional "SESSION <name> [key=value ...]" preamble line.
+        Returns (name, options); (None, {}) when the stream starts with audio. Bytes that are not
+        part of the header are kept in pushback, so no audio is lost.
+        """
+        magic = SESSION_HEADER_MAGIC
+        buf = b""
+        while running:
+            if not (magic.startswith(buf) or buf.startswith(magic)):
+                break  # plain PCM
+            if buf.startswith(magic) and (b"\n" in buf or len(buf) >= SESSION_HEADER_MAX_BYTES):
+                break
+            r = self.non_blocking_receive_audio()
+            if r is NO_DATA_YET:
+                continue
+            if r is STREAM_ENDED:
+                break
+            buf += r
+        if not (buf.startswith(magic) and b"\n" in buf):
+            self.pushback = buf
+            return None, {}
+        line, _, self.pushback = buf.partition(b"\n")
+        fields = line.decode("utf-8", errors="replace").split()[1:]
+        name = fields[0] if fields else None
+        if name is not None and not SESSION_NAME_RE.match(name):
+            logger.warning(f"Ignoring invalid session name {name!r}")
+            name = None
+        options = dict(f.split("=", 1) for f in fields[1:] if "=" in f)
+        return name, options
+
 
 # (Removed unused legacy 'io' import.)
 
@@ -158,24 +464,662 @@ def pcm16le_bytes_to_float32(raw_bytes: Optional[Union[bytes, bytearray, memoryv
     return audio
 
 
+def pcm16le_bytes_to_int16(raw_bytes: Optional[Union[bytes, bytearray, memoryview]]) -> Optional[np.ndarray]:
+    """Like pcm16le_bytes_to_float32 but keeps the wire format (for --buffer-dtype int16; no float conversion)."""
+    if not raw_bytes:
+        return None
+    ln = len(raw_bytes)
+    if ln % 2 == 1:  # odd length – drop last byte
+        logger.debug(f"Dropping trailing odd byte in audio packet len={ln}")
+        raw_bytes = raw_bytes[:-1]
+    if not raw_bytes:
+        return None
+    # copy: frombuffer over recv bytes would be read-only and pin the whole packet
+    return np.frombuffer(raw_bytes, dtype="<i2").astype(np.int16)
+
+
+class AudioReceiver:
+    """Per-session receive stage (double buffer).
+
+    A background thread keeps reading the socket and decoding PCM into a staging list while the
+    inference loop is busy in process_iter() (or waiting for its scheduler turn). take() swaps the
+    whole staging list out in one step,
+    so the next iteration can start as soon as the previous one ends instead of only then beginning
+    to accumulate min_chunk. There is a single consumer, so commit order is unchanged.
+    """
+
+    def __init__(self, connection, decode=pcm16le_bytes_to_float32, ready_samples=0):
+        self.connection = connection
+        self.decode = decode
+        self.ready_samples = ready_samples  # staged audio needed for an iteration (min_chunk)
+        self.session = ""  # name used for trace spans (set by ServerProcessor)
+        self._cond = threading.Condition()
+        self._staged = []
+        self._staged_samples = 0
+        self._staged_since = None  # arrival time of the oldest staged chunk
+        self._ready_since = None  # time the staged audio reached ready_samples (or the stream ended)
+        self._ended = False
+        self._stopped = False
+        self.taken_since = None  # arrival time of the oldest chunk returned by the last take()
+        self.taken_ready_since = None  # _ready_since of the audio returned by the last take()
+        self._thread = threading.Thread(target=self._run, name="audio-recv", daemon=True)
+
+    @property
+    def staged_samples(self):
+        return self._staged_samples
+
+    @property
+    def staged_since(self):
+        return self._staged_since
+
+    @property
+    def ready_since(self):
+        return self._ready_since
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Ask the receive thread to exit (it notices within CONN_RECV_TIMEOUT_SEC)."""
+        self._stopped = True
+        if timeout is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            while running and not self._stopped:
+                # idle time between packets is not part of the recv stage: wait untraced, then time the read
+                if not self.connection.wait_readable():
+                    continue
+                stage_trace.sample(self.session)
+                with stage_trace.span("recv"):
+                    raw_bytes = self.connection.non_blocking_receive_audio()
+                if raw_bytes is NO_DATA_YET:
+                    continue
+                if raw_bytes is STREAM_ENDED:
+                    break
+                with stage_trace.span("decode"):
+                    audio = self.decode(raw_bytes)
+                if audio is None or audio.size == 0:
+                    continue
+                with self._cond:
+                    if not self._staged:
+                        self._staged_since = time.time()
+                    self._staged.append(audio)
+                    self._staged_samples += audio.shape[0]
+                    if self._ready_since is None and self._staged_samples >= self.ready_samples:
+                        self._ready_since = time.time()
+                    self._cond.notify()
+        except OSError as e:
+            if not self._stopped:
+                self.connection.lost = True
+                logger.debug(f"Audio receive stopped: {e}")
+        finally:
+            with self._cond:
+                self._ended = True
+                if self._staged and self._ready_since is None:
+                    self._ready_since = time.time()  # final partial chunk is ready now
+                self._cond.notify()
+
+    def wait(self, min_samples, timeout=CONN_RECV_TIMEOUT_SEC):
+        """Wait up to timeout until min_samples are staged (or the stream ended).
+        Returns:
+          True: take() has audio (at least min_samples, or a final partial chunk)
+          NO_DATA_YET: not enough audio yet (staged audio stays for the next call)
+          STREAM_ENDED: remote closed and nothing is staged
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._staged_samples >= min_samples or self._ended, timeout)
+            if self._staged_samples < min_samples and not self._ended:
+                return NO_DATA_YET
+            if not self._staged:
+                return STREAM_ENDED
+            return True
+
+    def take(self):
+        """Swap out everything staged so far. Returns np.ndarray, or None if nothing is staged."""
+        with self._cond:
+            if not self._staged:
+                return None
+            chunks, self._staged = self._staged, []
+            self._staged_samples = 0
+            self.taken_since, self._staged_since = self._staged_since, None
+            self.taken_ready_since, self._ready_since = self._ready_since or time.time(), None
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks)
+
+
+class SessionStore:
+    """Session snapshots by name with a TTL, in memory or as one pickle file per session in a directory."""
+
+    def __init__(self, ttl, directory="", on_discard=None):
+        self.ttl = ttl
+        self.directory = directory
+        self.on_discard = on_discard  # called with (name, state) for snapshots that expire unresumed
+        self._lock = threading.Lock()
+        self._memory = {}  # name -> (saved_at, state)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + ".session.pkl")
+
+    def put(self, name, state):
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            if not self.directory:
+                self._memory[name] = (now, state)
+                return
+            tmp = self._path(name) + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(name))
+
+    def pop(self, name):
+        """Returns the snapshot saved under name within the TTL (and removes it), else None."""
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            if not self.directory:
+                entry = self._memory.pop(name, None)
+                return entry[1] if entry else None
+            try:
+                with open(self._path(name), "rb") as f:
+                    state = pickle.load(f)
+                os.remove(self._path(name))
+                return state
+            except FileNotFoundError:
+                return None
+
+    def purge(self):
+        with self._lock:
+            self._purge(time.time())
+
+    def discard_all(self):
+        """Server shutdown: in-memory snapshots are lost, so discard them now (on-disk ones are kept)."""
+        if not self.directory:
+            with self._lock:
+                for name in list(self._memory):
+                    self._discard(name, self._memory.pop(name)[1], "discarded at shutdown")
+
+    def _purge(self, now):
+        if not self.directory:
+            for name in [n for n, (t, _) in self._memory.items() if now - t > self.ttl]:
+                self._discard(name, self._memory.pop(name)[1])
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".session.pkl") and now - entry.stat().st_mtime > self.ttl:
+                try:
+                    with open(entry.path, "rb") as f:
+                        state = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    state = None
+                os.remove(entry.path)
+                self._discard(entry.name[: -len(".session.pkl")], state)
+
+    def _discard(self, name, state, reason="expired"):
+        logger.info(f"Snapshot of session '{name}' {reason}")
+        if self.on_discard is not None and state is not None:
+            self.on_discard(name, state)
+
+
+def flush_snapshot_tail(name, state):
+    """A checkpointed session was not resumed: publish the text it held back to the session's subscribers."""
+    if state.get("tail"):
+        hub.start(name)
+        hub.publish(name, state["tail"])
+        hub.end(name)
+
+
+session_store = (
+    SessionStore(SESSION_RESUME_TTL_SEC, SESSION_STORE_DIR, on_discard=flush_snapshot_tail)
+    if SESSION_RESUME_TTL_SEC > 0
+    else None
+)
+
+
+class DeadlineScheduler:
+    """Grants the shared model to one session iteration at a time, earliest deadline first.
+
+    A session's deadline is the time its next min_chunk of audio became ready plus the latency budget of its
+    priority class, so whichever stream has waited longest relative to its class goes next. A session with
+    a long buffer gets one iteration and then queues behind the others like everyone else.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (deadline, seq)
+        self._seq = itertools.count()
+        self._busy = False
+        self._busy_log = collections.deque()  # (end_time, busy_seconds) of recent turns
+        self._first_turn = None
+
+    @property
+    def depth(self):
+        return len(self._waiting)
+
+    def load(self, window=ADMIT_WINDOW_SEC):
+        """Fraction of the last window seconds the model was busy (aggregate real-time factor).
+        Until window seconds have passed since the first turn, the elapsed time is used instead."""
+        now = time.time()
+        with self._cond:
+            if self._first_turn is None:
+                return 0.0
+            while self._busy_log and self._busy_log[0][0] < now - window:
+                self._busy_log.popleft()
+            busy = sum(min(d, e - (now - window)) for e, d in self._busy_log)
+            span = min(window, now - self._first_turn)
+        return busy / span if span > 0 else 0.0
+
+    @contextlib.contextmanager
+    def turn(self, deadline):
+        with self._cond:
+            entry = (deadline, next(self._seq))
+            heapq.heappush(self._waiting, entry)
+            self._cond.wait_for(lambda: not self._busy and self._waiting[0] is entry)
+            heapq.heappop(self._waiting)
+            self._busy = True
+            t = time.time()
+            if self._first_turn is None:
+                self._first_turn = t
+        try:
+            yield
+        finally:
+            with self._cond:
+                now = time.time()
+                self._busy_log.append((now, now - t))
+                self._busy = False
+                self._cond.notify_all()
+
+
+def rss_mb():
+    """Resident set size in MB (Linux /proc; falls back to peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class AdmissionController:
+    """Decides from live measurements whether the host has headroom for another session."""
+
+    def __init__(self):
+        self.saturated = False
+        self.degraded = False
+        self.reason = ""
+
+    def measure(self):
+        return {"load": round(scheduler.load(), 3), "queue_depth": scheduler.depth, "rss_mb": round(rss_mb(), 1)}
+
+    def update(self):
+        """Re-evaluate saturation; degraded mode turns off only once load is clearly below the threshold."""
+        m = self.measure()
+        reasons = []
+        if ADMIT_MAX_LOAD and m["load"] > ADMIT_MAX_LOAD:
+            reasons.append(f"load {m['load']:.2f}")
+        if ADMIT_MAX_QUEUE and m["queue_depth"] > ADMIT_MAX_QUEUE:
+            reasons.append(f"queue {m['queue_depth']}")
+        if ADMIT_MAX_RSS_MB and m["rss_mb"] > ADMIT_MAX_RSS_MB:
+            reasons.append(f"rss {m['rss_mb']:.0f}MB")
+        saturated = bool(reasons)
+        if saturated != self.saturated:
+            if saturated:
+                logger.warning(f"Host saturated ({', '.join(reasons)}); rejecting new sessions")
+            else:
+                logger.info("Host has headroom again; admitting new sessions")
+        self.saturated, self.reason = saturated, ", ".join(reasons)
+        if DEGRADE_BEAM_SIZE:
+            degraded = saturated or (self.degraded and not self.headroom(m))
+            if degraded != self.degraded:
+                state = f"beam_size<={DEGRADE_BEAM_SIZE}" if degraded else "default decoding"
+                logger.warning(f"Degraded decoding {'on' if degraded else 'off'} ({state})")
+            self.degraded = degraded
+        return m
+
+    def headroom(self, m):
+        """Every configured measure is clearly (below 80% of its threshold) out of the saturated range."""
+        limits = ((ADMIT_MAX_LOAD, m["load"]), (ADMIT_MAX_QUEUE, m["queue_depth"]), (ADMIT_MAX_RSS_MB, m["rss_mb"]))
+        return all(value <= DEGRADE_RECOVER_FRACTION * limit for limit, value in limits if limit)
+
+    def decode_options(self, profile):
+        """Extra decode options while degraded: never a wider beam than the session's profile already uses."""
+        if not self.degraded:
+            return {}
+        return {"beam_size": min(DEGRADE_BEAM_SIZE, DECODE_PROFILES[profile]["beam_size"])}
+
+    def stats(self):
+        m = self.measure()
+        m.update({"saturated": self.saturated, "reason": self.reason, "degraded": self.degraded})
+        return m
+
+
+admission = AdmissionController()
+
+
+def nearest_profile(profile, ladder):
+    """The most accurate profile of ladder that is as fast as profile or faster (the fastest one if none is);
+    profile itself when the ASR offers it."""
+    order = list(DECODE_PROFILES)
+    rank = order.index(profile) if profile in order else 0
+    return next((p for p in ladder if order.index(p) >= rank), ladder[-1])
+
+
+class DecodeProfileController:
+    """Per-session decoding profile chosen from measured lag: one rung per switch, with a hold time."""
+
+    def __init__(self, session, top):
+        self.session = session
+        self.top = top  # most accurate profile this session may use
+        self.profile = top
+        self.switched_at = 0.0
+        self.switches = 0
+        self.decisions = collections.deque(maxlen=PROFILE_DECISIONS_KEPT)
+
+    def fit(self, ladder):
+        """Clamp the profiles to the ones the ASR offers (e.g. header profile=draft without --draft-model)."""
+        top = nearest_profile(self.top, ladder)
+        if top != self.top:
+            logger.warning(f"Session '{self.session}': decoding profile {self.top} is not available, using {top}")
+        self.top = top
+        self.profile = nearest_profile(self.profile, ladder[ladder.index(top) :])
+
+    def update(self, lag, ladder):
+        """lag: seconds the audio of this iteration waited; ladder: profiles the ASR offers, most accurate first."""
+        if not ADAPTIVE_PROFILE_LAG_SEC:
+            return self.profile
+        ladder = ladder[ladder.index(nearest_profile(self.top, ladder)) :]
+        i = ladder.index(nearest_profile(self.profile, ladder))
+        now = time.time()
+        if now - self.switched_at < ADAPTIVE_PROFILE_HOLD_SEC:
+            return self.profile
+        if lag > ADAPTIVE_PROFILE_LAG_SEC and i + 1 < len(ladder):
+            target, reason, log = ladder[i + 1], f"lag {lag:.1f}s > {ADAPTIVE_PROFILE_LAG_SEC:.1f}s", logger.warning
+        elif lag < 0.5 * ADAPTIVE_PROFILE_LAG_SEC and i > 0:
+            target, reason, log = ladder[i - 1], f"lag {lag:.1f}s < {0.5 * ADAPTIVE_PROFILE_LAG_SEC:.1f}s", logger.info
+        else:
+            return self.profile
+        log(f"Session '{self.session}' decoding profile {self.profile} -> {target} ({reason})")
+        self.decisions.append(
+            {"time": round(now, 3), "from": self.profile, "to": target, "lag_sec": round(lag, 3), "reason": reason}
+        )
+        self.profile = target
+        self.switched_at = now
+        self.switches += 1
+        return target
+
+    def stats(self):
+        return {"profile": self.profile, "profile_switches": self.switches, "profile_decisions": list(self.decisions)}
+
+
+def reject_client(conn, reason):
+    """Tell a client to retry later (one JSON line) and close the connection."""
+    logger.info(f"Rejecting session ({reason}); retry after {RETRY_AFTER_SEC}s")
+    try:
+        conn.settimeout(CONN_RECV_TIMEOUT_SEC)
+        line_packet.send_one_line(conn, json.dumps({"error": "overloaded", "retry_after": RETRY_AFTER_SEC}))
+    except OSError:
+        pass
+    try:
+        conn.close()
+    except OSError:
+        pass
+
+
+scheduler = DeadlineScheduler()
+sessions = {}  # id(ServerProcessor) -> ServerProcessor, for stats
+sessions_lock = threading.Lock()
+
+
+def session_stats():
+    with sessions_lock:
+        procs = list(sessions.values())
+    return {
+        "startup": startup_phases,
+        "scheduler_queue_depth": scheduler.depth,
+        "admission": admission.stats(),
+        "sessions": [p.stats() for p in procs],
+    }
+
+
+class TranscriptHub:
+    """Named transcript topics. Ingest sessions publish JSON lines; read-only subscribers receive them.
+
+    Each topic keeps a small replay ring for late joiners. Publishing only enqueues the already formatted
+    line on every subscriber's LineWriter, so extra consumers cost no ASR compute and never block inference.
+    """
+
+    def __init__(self, replay_lines=REPLAY_LINES):
+        self.replay_lines = replay_lines
+        self._lock = threading.Lock()
+        self._replay = {}  # name -> deque of recent lines
+        self._subscribers = {}  # name -> list of LineWriter
+        self._publishers = collections.Counter()  # name -> running ingest sessions
+
+    def publish(self, name, line):
+        with self._lock:
+            self._replay.setdefault(name, collections.deque(maxlen=self.replay_lines)).append(line)
+            writers = self._subscribers.get(name)
+            if not writers:
+                return
+            alive = []
+            for w in writers:
+                try:
+                    w.put(line)
+                    alive.append(w)
+                except BrokenPipeError:
+                    logger.debug(f"Subscriber of session '{name}' gone")
+            self._subscribers[name] = alive
+
+    def start(self, name):
+        with self._lock:
+            self._publishers[name] += 1
+
+    def end(self, name):
+        """An ingest session stopped publishing; forget the topic unless live subscribers wait for it."""
+        with self._lock:
+            self._publishers[name] -= 1
+            if self._publishers[name] > 0:
+                return
+            del self._publishers[name]
+            alive = [w for w in self._subscribers.get(name, ()) if not w.failed]
+            if alive:
+                self._subscribers[name] = alive
+                return
+            self._subscribers.pop(name, None)
+            self._replay.pop(name, None)
+
+    def close(self):
+        """Shutdown: let every subscriber drain what was published (bounded by SEND_DRAIN_TIMEOUT_SEC in total)."""
+        with self._lock:
+            writers = [w for ws in self._subscribers.values() for w in ws]
+            self._subscribers.clear()
+        deadline = time.time() + SEND_DRAIN_TIMEOUT_SEC
+        for w in writers:
+            w.close(timeout=max(0.0, deadline - time.time()))
+
+    def subscribe(self, name, writer):
+        with self._lock:
+            for line in self._replay.get(name, ()):
+                writer.put(line)
+            self._subscribers.setdefault(name, []).append(writer)
+            count = len(self._subscribers[name])
+        logger.info(f"Subscriber attached to session '{name}' ({count} total)")
+
+
+hub = TranscriptHub()
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def encode_sse_event(line):
+    return b"data: " + line.encode("utf-8", errors="replace") + b"\n\n"
+
+
+def encode_websocket_text(line):
+    """Single unmasked text frame (server -> client)."""
+    payload = line.encode("utf-8", errors="replace")
+    n = len(payload)
+    if n < 126:
+        header = bytes((0x81, n))
+    elif n < 65536:
+        header = bytes((0x81, 126)) + n.to_bytes(2, "big")
+    else:
+        header = bytes((0x81, 127)) + n.to_bytes(8, "big")
+    return header + payload
+
+
+def handle_subscriber(conn, addr):
+    """Read the subscriber request and attach it to a session.
+    - raw TCP: one line "SUBSCRIBE <name>" (or just "<name>"; empty = SESSION_NAME), then line_packet lines
+    - HTTP GET /subscribe/<name>: WebSocket if an Upgrade header is present, otherwise Server-Sent Events
+    - HTTP GET /stats: one JSON snapshot of per-session lag, scheduler queue depth and admission state
+    - HTTP GET /health: 200 while new sessions are admitted, 503 + Retry-After when saturated (load balancers)
+    - HTTP GET /trace[?rate=R&reset=1]: Chrome trace-event JSON of sampled stage spans; /trace/summary: per-session
+      rolling stage summary. rate changes the sampling rate at runtime (0 = off).
+    """
+    conn.settimeout(CONN_RECV_TIMEOUT_SEC)
+    buf = b""
+    try:
+        while running and len(buf) < SESSION_HEADER_MAX_BYTES * 8:
+            if buf.startswith(b"GET ") and b"\r\n\r\n" in buf:
+                break
+            if not buf.startswith(b"GET "[: len(buf)]) and b"\n" in buf:
+                break
+            try:
+                r = conn.recv(4096)
+            except socket.timeout:
+                continue
+            if not r:
+                break
+            buf += r
+    except OSError:
+        buf = b""
+    if not buf:
+        conn.close()
+        return
+    head = buf.decode("utf-8", errors="replace")
+    if head.startswith("GET "):
+        lines = head.split("\r\n")
+        path = lines[0].split(" ")[1] if len(lines[0].split(" ")) > 1 else ""
+        headers = {}
+        for h in lines[1:]:
+            k, sep, v = h.partition(":")
+            if sep:
+                headers[k.strip().lower()] = v.strip()
+        if path == "/health":
+            admission.update()
+            admit = model_ready.is_set() and not admission.saturated and len(sessions) < MAX_SESSIONS
+            status = b"200 OK" if admit else b"503 Service Unavailable"
+            body = json.dumps(
+                {"admit": admit, "ready": model_ready.is_set(), "sessions": len(sessions), "max_sessions": MAX_SESSIONS}
+            ).encode()
+            retry = b"" if admit else f"Retry-After: {RETRY_AFTER_SEC}\r\n".encode()
+            conn.sendall(
+                b"HTTP/1.1 "
+                + status
+                + b"\r\nContent-Type: application/json\r\nConnection: close\r\n"
+                + retry
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            conn.close()
+            return
+        if path.startswith("/trace"):
+            route, _, query = path.partition("?")
+            params = dict(p.partition("=")[::2] for p in query.split("&") if p)
+            if "rate" in params:
+                try:
+                    stage_trace.set_sample_rate(params["rate"])
+                    logger.info(f"Trace sample rate set to {stage_trace.sample_rate()}")
+                except ValueError:
+                    pass
+            if route == "/trace/summary":
+                payload = {"sample_rate": stage_trace.sample_rate(), "sessions": stage_trace.summary()}
+            else:
+                payload = stage_trace.chrome_trace()
+            if "reset" in params:  # after the snapshot: "export and start over"
+                stage_trace.reset()
+            body = json.dumps(payload).encode()
+            conn.sendall(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            conn.close()
+            return
+        if path == "/stats":
+            body = json.dumps(session_stats()).encode()
+            conn.sendall(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            conn.close()
+            return
+        name = path[len("/subscribe/") :] if path.startswith("/subscribe/") else None
+        if not name or not SESSION_NAME_RE.match(name):
+            conn.sendall(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            conn.close()
+            return
+        if headers.get("upgrade", "").lower() == "websocket" and "sec-websocket-key" in headers:
+            digest = hashlib.sha1((headers["sec-websocket-key"] + WEBSOCKET_GUID).encode()).digest()
+            accept = base64.b64encode(digest).decode()
+            conn.sendall(
+                (
+                    "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                    f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+                ).encode()
+            )
+            encode, kind = encode_websocket_text, "websocket"
+        else:
+            conn.sendall(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\n\r\n"
+            )
+            encode, kind = encode_sse_event, "sse"
+    else:
+        fields = head.splitlines()[0].split() if head.strip() else []
+        if fields and fields[0].upper() == "SUBSCRIBE":
+            fields = fields[1:]
+        name = fields[0] if fields else SESSION_NAME
+        if not SESSION_NAME_RE.match(name):
+            conn.close()
+            return
+        encode, kind = line_packet.encode_line, "tcp"
+    logger.debug(f"{kind} subscriber {addr} for session '{name}'")
+    hub.subscribe(name, LineWriter(conn, encode=encode, owns_socket=True))
+
+
+def subscriber_listener(port):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind((args.host, port))
+        s.listen(16)
+        s.settimeout(1.0)
+        logger.info("Subscribers listening on" + str((args.host, port)))
+        while running:
+            try:
+                conn, addr = s.accept()
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if running:
+                    logger.error(f"Subscriber accept error: {e}; continuing")
+                continue
+            threading.Thread(target=handle_subscriber, args=(conn, addr), name="subscriber", daemon=True).start()
+
+
 # wraps socket and ASR object, and serves one client connection.
 # next client should be served by a new instance of this object
 class ServerProcessor:
 
     def timedelta_to_webvtt(self, delta):
-        # Format this:0:00:00
-        # Format this:0:00:09.480000
-        parts = delta.split(":")
-        parts2 = parts[2].split(".")
-
-        final_data = "{:02d}".format(int(parts[0])) + ":"
-        final_data += "{:02d}".format(int(parts[1])) + ":"
-        final_data += "{:02d}".format(int(parts2[0])) + "."
-        if len(parts2) == 1:
-            final_data += "000"
-        else:
-            final_data += "{:03d}".format(int(int(parts2[1]) / 1000))
-        return final_data
+        return timedelta_to_webvtt(delta)
 
     def __init__(self, c, online_asr_proc, min_chunk):
         self.connection = c
@@ -183,53 +1127,120 @@ class ServerProcessor:
         self.min_chunk = min_chunk
         self.last_end = None
         self.is_first = True
+        # int16 buffers get the wire samples as-is; float32 buffers get them decoded once on receive
+        decode = pcm16le_bytes_to_int16 if online_asr_proc.buffer_dtype == np.int16 else pcm16le_bytes_to_float32
+        self.receiver = AudioReceiver(c, decode=decode, ready_samples=int(min_chunk * SAMPLING_RATE))
+        self.session_name = SESSION_NAME
+        self.session_options = {}
+        self.resumable = False  # named via header and SESSION_RESUME_TTL_SEC>0: checkpoint instead of finish
+        self.restored_tail = None  # held-back text of the snapshot this session was resumed from
+        self.priority = SESSION_PRIORITY
+        self.iterations = 0
+        self.last_iter_sec = 0.0
+        self.dropped_sec = 0.0
+        self.wait_sec = 0.0  # queueing delay of the last iteration: min_chunk was ready -> processing started
+        self.profiles = DecodeProfileController(
+            self.session_name, online_asr_proc.decode_options.get("profile", "accurate")
+        )
 
     def receive_audio_chunk(self) -> Union[np.ndarray, object, None]:
-        """Accumulate enough audio to meet min_chunk (except when stream ends).
+        """Take everything the receiver staged (called once wait() reported audio ready).
 
         Returns:
-          np.ndarray: ready chunk
-          NO_DATA_YET: temporary lack of data (keep looping)
-          STREAM_ENDED: remote closed and no more audio
+          np.ndarray: ready chunk (at least min_chunk, more if audio piled up while waiting for a turn)
+          NO_DATA_YET: short first chunk at stream end (dropped, as before)
         """
-        global running
-        out = []
         minlimit = self.min_chunk * SAMPLING_RATE
-        samples_accum = 0
-        while running and samples_accum < minlimit:
-            raw_bytes = self.connection.non_blocking_receive_audio()
-            if raw_bytes is NO_DATA_YET:
-                # Only return NO_DATA_YET if we have accumulated nothing.
-                if not out:
-                    return NO_DATA_YET
-                else:
-                    # Wait again; continue loop to try fill minlimit.
-                    continue
-            if raw_bytes is STREAM_ENDED:
-                # If we have partial audio, process it even if below minlimit (end of stream)
-                if out:
-                    break
-                return STREAM_ENDED
-            # Normal bytes path
-            if not raw_bytes:  # defensive (should be handled above)
-                return NO_DATA_YET if not out else np.concatenate(out)
-            audio = pcm16le_bytes_to_float32(raw_bytes)
-            if audio is None or audio.size == 0:
-                if not out:
-                    return NO_DATA_YET
-                break
-            out.append(audio)
-            samples_accum += audio.shape[0]
-
-        if not out:
+        result = self.receiver.take()
+        if result is None:
             return NO_DATA_YET
-        # For first chunk, enforce minlimit unless stream ended (handled above)
-        if self.is_first and samples_accum < minlimit:
+        # For first chunk, enforce minlimit unless stream ended (short tail is dropped, as before)
+        if self.is_first and result.shape[0] < minlimit:
             return NO_DATA_YET
         self.is_first = False
-        if len(out) == 1:
-            return out[0]
-        return np.concatenate(out)
+        return result
+
+    def checkpoint(self):
+        """Save the session for resume; audio received but not yet processed goes into the snapshot too."""
+        pending = self.receiver.take()
+        if pending is not None:
+            self.online_asr_proc.insert_audio_chunk(pending)
+        # the hypothesis finish() would flush now; published to subscribers if the snapshot is never resumed
+        backend = self.online_asr_proc.asr or asr
+        if backend is None:
+            # EARLY_LISTEN, model still loading: nothing was processed, the hypothesis is the restored one (if any)
+            tail = self.restored_tail
+        else:
+            proc = self.online_asr_proc
+            beg, end, text = proc.to_flush(proc.transcript_buffer.complete(), separator=backend.transcription_separator)
+            tail = None
+            if beg is not None:
+                tail = transcript_json(beg if self.last_end is None else max(beg, self.last_end), end, text, language)
+        state = {
+            "online": self.online_asr_proc.snapshot(),
+            "last_end": self.last_end,
+            "last_line": self.connection.last_line,
+            "tail": tail,
+        }
+        try:
+            session_store.put(self.session_name, state)
+        except OSError as e:
+            logger.error(f"Could not checkpoint session '{self.session_name}': {e}")
+            return
+        proc = self.online_asr_proc
+        at = proc.buffer_time_offset + len(proc.audio_buffer) / SAMPLING_RATE
+        logger.info(
+            f"Session '{self.session_name}' checkpointed at {at:.2f}s (resumable for {SESSION_RESUME_TTL_SEC:.0f}s)"
+        )
+
+    def restore(self, state):
+        self.online_asr_proc.restore(state["online"])
+        self.last_end = state["last_end"]
+        self.connection.last_line = state["last_line"]
+        self.restored_tail = state.get("tail")
+        self.is_first = False
+        proc = self.online_asr_proc
+        at = proc.buffer_time_offset + len(proc.audio_buffer) / SAMPLING_RATE
+        logger.info(f"Session '{self.session_name}' resumed at {at:.2f}s ({len(proc.commited)} committed words)")
+
+    def deadline(self):
+        since = self.receiver.ready_since or time.time()
+        return since + PRIORITY_BUDGET_SEC[self.priority]
+
+    def commit_lag(self):
+        """Seconds of received audio not yet covered by committed transcript."""
+        proc = self.online_asr_proc
+        audio_end = proc.buffer_time_offset + (len(proc.audio_buffer) + self.receiver.staged_samples) / SAMPLING_RATE
+        return max(0.0, audio_end - proc.transcript_buffer.last_commited_time)
+
+    def stats(self):
+        return {
+            "session": self.session_name,
+            "priority": self.priority,
+            "commit_lag_sec": round(self.commit_lag(), 3),
+            "staged_sec": round(self.receiver.staged_samples / SAMPLING_RATE, 3),
+            "buffer_sec": round(len(self.online_asr_proc.audio_buffer) / SAMPLING_RATE, 3),
+            "iterations": self.iterations,
+            "last_iter_sec": round(self.last_iter_sec, 3),
+            "dropped_sec": round(self.dropped_sec, 3),
+            "wait_sec": round(self.wait_sec, 3),
+            **self.profiles.stats(),
+        }
+
+    def drop_stale(self, audio, results):
+        """Hopelessly behind: skip all but the newest min_chunk of audio and restart the processor at the
+        new absolute offset. The pending hypothesis is flushed into results first."""
+        keep = int(self.min_chunk * SAMPLING_RATE)
+        drop = audio.shape[0] - keep
+        if drop <= 0:
+            return audio
+        results.append(self.online_asr_proc.skip_ahead(drop / SAMPLING_RATE))
+        self.dropped_sec += drop / SAMPLING_RATE
+        logger.warning(
+            f"Session '{self.session_name}' behind by {self.wait_sec:.1f}s; "
+            f"skipped {drop / SAMPLING_RATE:.1f}s of audio"
+        )
+        return audio[drop:]
 
     def format_output_transcript(self, o):
         # This function differs from whisper_online.output_transcript in the following:
@@ -248,51 +1259,119 @@ class ServerProcessor:
             end_webvtt = self.timedelta_to_webvtt(str(datetime.timedelta(seconds=end)))
             logger.info("%s -> %s %s" % (beg_webvtt, end_webvtt, o[2].strip()))
 
-            data = {}
-            # language field: use provided --lan unless 'auto', then fallback to 'en'
-            if language and language != "auto":
-                data["language"] = language
-            else:
-                data["language"] = "en"
-            data["start"] = "%1.3f" % datetime.timedelta(seconds=beg).total_seconds()
-            data["end"] = "%1.3f" % datetime.timedelta(seconds=end).total_seconds()
-            data["text"] = o[2].strip()
-
-            return json.dumps(data)
+            return transcript_json(beg, end, o[2], language)
         else:
             logger.debug("No text in this segment")
             return None
 
     def send_result(self, o):
-        msg = self.format_output_transcript(o)
+        with stage_trace.span("format"):
+            msg = self.format_output_transcript(o)
         if msg is not None:
-            self.connection.send(msg)
+            with stage_trace.span("enqueue"):
+                hub.publish(self.session_name, msg)
+                self.connection.send(msg)
 
     def process(self):
         global running
         # handle one client connection
-        self.online_asr_proc.init()
+        if SESSION_HEADER:
+            name, self.session_options = self.connection.read_session_header()
+            if name is not None:
+                self.session_name = name
+        priority = self.session_options.get("priority", self.priority)
+        if priority in PRIORITY_BUDGET_SEC:
+            self.priority = priority
+        else:
+            logger.warning(f"Ignoring unknown session priority {priority!r}")
+        profile = self.session_options.get("profile", self.profiles.top)
+        if profile in DECODE_PROFILES:
+            self.profiles.top = self.profiles.profile = profile
+        else:
+            logger.warning(f"Ignoring unknown decoding profile {profile!r}")
+        self.profiles.session = self.session_name
+        if self.online_asr_proc.asr is not None:
+            self.profiles.fit(self.online_asr_proc.asr.decode_profiles())
+        logger.info(f"Ingest session '{self.session_name}' (priority {self.priority}, profile {self.profiles.top})")
+        self.receiver.session = self.connection.writer.trace_session = self.session_name
+        hub.start(self.session_name)
+        try:
+            self.serve()
+        finally:
+            hub.end(self.session_name)
+
+    def serve(self):
+        """Transcribe until the client disconnects (after process() has read the session header)."""
+        global running
+        self.resumable = session_store is not None and self.session_name != SESSION_NAME
+        state = None
+        if self.resumable and self.session_options.get("resume") in ("1", "true", "yes"):
+            state = session_store.pop(self.session_name)
+            if state is None:
+                logger.info(f"No snapshot to resume for session '{self.session_name}'; starting fresh")
+        if state is not None:
+            self.restore(state)
+        else:
+            self.online_asr_proc.init()
+        self.receiver.start()
+        minlimit = self.min_chunk * SAMPLING_RATE
         first_time = True
         while running:
-            result = self.receive_audio_chunk()
-            if result is NO_DATA_YET:
+            ready = self.receiver.wait(minlimit)
+            if ready is NO_DATA_YET:
                 continue  # remain in loop waiting for more audio
-            if result is STREAM_ENDED:
+            if ready is STREAM_ENDED:
                 logger.info("Client stream ended")
                 break
-            # got usable audio chunk
-            if first_time:
-                first_time = False
-                logger.info("Receiving Audio")
-            self.online_asr_proc.insert_audio_chunk(result)
-            o = online.process_iter()
+            if not model_ready.is_set():
+                model_ready.wait(CONN_RECV_TIMEOUT_SEC)  # EARLY_LISTEN: keep buffering until the model is loaded
+                continue
+            if self.online_asr_proc.asr is None:
+                self.online_asr_proc.asr = asr  # connected while the model was still loading
+                self.profiles.fit(asr.decode_profiles())
+            results = []
+            stage_trace.sample(self.session_name)
+            with scheduler.turn(self.deadline()):
+                # take after the turn is granted: audio that arrived while waiting is merged into this iteration
+                result = self.receive_audio_chunk()
+                if result is NO_DATA_YET:
+                    continue
+                # got usable audio chunk
+                if first_time:
+                    first_time = False
+                    logger.info("Receiving Audio")
+                # queueing delay only: the min_chunk accumulation before the audio was ready does not count
+                self.wait_sec = time.time() - self.receiver.taken_ready_since
+                if SCHED_DROP_LAG_SEC > 0 and self.wait_sec > SCHED_DROP_LAG_SEC:
+                    result = self.drop_stale(result, results)
+                profile = self.profiles.update(self.wait_sec, self.online_asr_proc.asr.decode_profiles())
+                if ADMISSION_ENABLED:
+                    admission.update()
+                    self.online_asr_proc.decode_options = {"profile": profile, **admission.decode_options(profile)}
+                else:
+                    self.online_asr_proc.decode_options = {"profile": profile}
+                t = time.time()
+                self.online_asr_proc.insert_audio_chunk(result)
+                results.append(self.online_asr_proc.process_iter())
+                self.last_iter_sec = time.time() - t
+                self.iterations += 1
             try:
-                self.send_result(o)
+                for o in results:
+                    self.send_result(o)
             except BrokenPipeError:
                 logger.info("broken pipe -- connection closed?")
+                self.connection.lost = True
                 break
+        self.receiver.stop()
+        # checkpoint only when the client went away without ending its stream (or for a restart with a store
+        # directory); an orderly end of stream is finished as usual
+        if self.resumable and (self.connection.lost or (not running and SESSION_STORE_DIR)):
+            self.checkpoint()
+            return
+        if self.online_asr_proc.asr is None:
+            return  # model never became ready (EARLY_LISTEN + failed load / shutdown): nothing to flush
         # Flush remaining segments
-        o = online.finish()
+        o = self.online_asr_proc.finish()
         try:
             self.send_result(o)
         except BrokenPipeError:
@@ -333,65 +1412,114 @@ signal.signal(signal.SIGTERM, stop)
 
 
 def handle_client(conn, addr):
-    """Process a single client connection (serial, no concurrency)."""
+    """Process a single client connection (one thread per connection, up to MAX_SESSIONS)."""
     connection = Connection(conn)
-    proc = ServerProcessor(connection, online, args.min_chunk_size)
-    proc.process()
+    proc = ServerProcessor(connection, online_factory(asr, args), args.min_chunk_size)
+    with sessions_lock:
+        sessions[id(proc)] = proc
     try:
-        conn.close()
-    except OSError:
-        pass
+        proc.process()
+    finally:
+        with sessions_lock:
+            sessions.pop(id(proc), None)
+        connection.close()
+        proc.receiver.stop(timeout=CONN_RECV_TIMEOUT_SEC)
+
+
+def serve_client(conn, addr):
+    """Session thread body: handle_client plus error reporting; frees the session slot on exit."""
+    import errno
+
+    try:
+        logger.debug("Connected to client on {}".format(addr))
+        handle_client(conn, addr)
+        logger.debug("Connection to client closed {}".format(addr))
+    except Exception as e:
+        if not running:
+            return
+        # Normalize common connection reset scenarios (Windows WinError 10054 / POSIX ECONNRESET)
+        win_err = getattr(e, "winerror", None)
+        err_no = getattr(e, "errno", None)
+        msg = str(e)
+        if win_err == 10054 or err_no == errno.ECONNRESET or "10054" in msg or "ECONNRESET" in msg:
+            logger.info(f"Unexpected client disconnect (connection reset) peer={addr[0]}:{addr[1]}")
+        else:
+            logger.error(f"Unexpected session error: {e} peer={addr[0]}:{addr[1]}")
+    finally:
+        session_slots.release()
+
+
+if SUBSCRIBE_PORT:
+    threading.Thread(
+        target=subscriber_listener, args=(SUBSCRIBE_PORT,), name="subscriber-listener", daemon=True
+    ).start()
 
+session_slots = threading.BoundedSemaphore(MAX_SESSIONS)
+session_threads = []
+
+if EARLY_LISTEN:
+    # model load runs in parallel with bind/listen and early connections
+    threading.Thread(target=load_model_background, name="model-load", daemon=True).start()
 
 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     server_socket = s
     s.bind((args.host, args.port))
-    s.listen(5)  # increased backlog (Phase 6); still serial accept/process
+    s.listen(5)  # connections beyond MAX_SESSIONS wait in the backlog
     # Set a timeout so accept() wakes up periodically to observe running flag on Windows
     s.settimeout(1.0)
     logger.info("Listening on" + str((args.host, args.port)))
-    last_client_addr = None
+    startup_phase_done("listening", round(time.time() - STARTUP_T0, 3))
+    if not model_ready.is_set():
+        logger.info("Model still loading; incoming audio is buffered until it is ready")
+    if MAX_SESSIONS > 1:
+        logger.info(f"Serving up to {MAX_SESSIONS} concurrent sessions")
+    if ADMISSION_ENABLED:
+        logger.info("Admission control enabled")
     while running:
+        # Only accept when a session slot is free (MAX_SESSIONS=1 keeps serial accept/process).
+        # With admission control, accept right away and reject instead of leaving clients in the backlog.
+        if not ADMISSION_ENABLED and not session_slots.acquire(timeout=1.0):
+            continue
         try:
-            try:
-                conn, addr = s.accept()
-            except socket.timeout:
-                if not running:
-                    break
-                continue
-            except OSError as e:
-                if not running:
-                    break  # socket was closed due to shutdown
-                logger.error(f"Socket accept error: {e}; continuing")
-                continue
-            logger.debug("Connected to client on {}".format(addr))
-            last_client_addr = addr
-            handle_client(conn, addr)
-            logger.debug("Connection to client closed {}".format(addr))
-        except Exception as e:
+            conn, addr = s.accept()
+        except socket.timeout:
+            if not ADMISSION_ENABLED:
+                session_slots.release()
+            if session_store is not None:
+                session_store.purge()  # expire unresumed snapshots on time, not only on the next put/pop
+            continue
+        except OSError as e:
+            if not ADMISSION_ENABLED:
+                session_slots.release()
             if not running:
-                break
-            import errno
-
-            # Normalize common connection reset scenarios (Windows WinError 10054 / POSIX ECONNRESET)
-            win_err = getattr(e, "winerror", None)
-            err_no = getattr(e, "errno", None)
-            msg = str(e)
-            if win_err == 10054 or err_no == errno.ECONNRESET or "10054" in msg or "ECONNRESET" in msg:
-                if last_client_addr:
-                    logger.info(
-                        f"Unexpected client disconnect (connection reset) peer={last_client_addr[0]}:{last_client_addr[1]}"
-                    )
-                else:
-                    logger.info("Unexpected client disconnect (connection reset)")
-            else:
-                if last_client_addr:
-                    logger.error(
-                        f"Unexpected server loop error: {e} peer={last_client_addr[0]}:{last_client_addr[1]}; continuing"
-                    )
-                else:
-                    logger.error(f"Unexpected server loop error: {e}; continuing")
+                break  # socket was closed due to shutdown
+            logger.error(f"Socket accept error: {e}; continuing")
             continue
+        if ADMISSION_ENABLED:
+            admission.update()
+            if admission.saturated:
+                reject_client(conn, admission.reason)
+                continue
+            if not session_slots.acquire(blocking=False):
+                reject_client(conn, f"all {MAX_SESSIONS} session slots in use")
+                continue
+        t = threading.Thread(target=serve_client, args=(conn, addr), name=f"session-{addr[1]}")
+        t.start()
+        session_threads = [x for x in session_threads if x.is_alive()] + [t]
+
+for t in session_threads:
+    t.join(SEND_DRAIN_TIMEOUT_SEC + CONN_RECV_TIMEOUT_SEC)
+if session_store is not None:
+    session_store.discard_all()
+hub.close()
+
+if TRACE_FILE:
+    try:
+        with open(TRACE_FILE, "w") as f:
+            json.dump(stage_trace.chrome_trace(), f)
+        logger.info(f"Stage trace written to {TRACE_FILE}")
+    except OSError as e:
+        logger.warning(f"Could not write stage trace: {e}")
 
 if not shutdown_logged:
     logger.info("Server stopped gracefully")